@@ -0,0 +1,41 @@
+"""
+Numba 可选加速。
+
+numba 不是必需依赖: 安装了 numba 时，被 @njit 装饰的函数会被编译为机器码；
+未安装时原样返回 Python 函数，计算结果一致，只是速度较慢。
+
+使用方法:
+    from quant_backtest._jit import njit, prange
+
+    @njit(cache=True)
+    def kernel(arr):
+        ...
+
+    @njit(parallel=True, cache=True)
+    def batch_kernel(mat):
+        for i in prange(mat.shape[0]):   # 未安装 numba 时 prange 即 range
+            ...
+"""
+
+try:
+    import numba
+    HAS_NUMBA = True
+    prange = numba.prange
+except ImportError:
+    numba = None
+    HAS_NUMBA = False
+    prange = range
+
+
+def njit(*args, **kwargs):
+    """
+    numba.njit 的兼容封装。
+    支持 @njit 和 @njit(cache=True, ...) 两种写法。
+    """
+    if args and callable(args[0]) and len(args) == 1 and not kwargs:
+        func = args[0]
+        return numba.njit(func) if HAS_NUMBA else func
+
+    def decorator(func):
+        return numba.njit(*args, **kwargs)(func) if HAS_NUMBA else func
+    return decorator
@@ -1,5 +1,5 @@
-from .metrics import calculate_all_metrics
+from .metrics import calculate_all_metrics, calculate_all_metrics_batch
 from .report import ReportGenerator
 from .result import BacktestResult
 
-__all__ = ['calculate_all_metrics', 'ReportGenerator', 'BacktestResult']
+__all__ = ['calculate_all_metrics', 'calculate_all_metrics_batch', 'ReportGenerator', 'BacktestResult']
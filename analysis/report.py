@@ -61,9 +61,19 @@ class ReportGenerator:
         print("-" * 80)
 
         display = trades.tail(top_n)
-        for _, row in display.iterrows():
-            date_str = row['datetime'].strftime('%Y-%m-%d') if hasattr(row['datetime'], 'strftime') else str(row['datetime'])[:10]
-            print(f"  {date_str:<12} {row['direction']:<6} {row['price']:>10.2f} {row['quantity']:>8} {row['commission']:>10.2f}")
+        # 按列整体格式化后一次性输出，避免逐行 iterrows
+        if pd.api.types.is_datetime64_any_dtype(display['datetime']):
+            dates = display['datetime'].dt.strftime('%Y-%m-%d')
+        else:
+            dates = display['datetime'].astype(str).str[:10]
+        lines = (
+            "  " + dates.str.ljust(12)
+            + " " + display['direction'].astype(str).str.ljust(6)
+            + " " + display['price'].map('{:>10.2f}'.format)
+            + " " + display['quantity'].astype(str).str.rjust(8)
+            + " " + display['commission'].map('{:>10.2f}'.format)
+        )
+        print(lines.str.cat(sep='\n'))
 
         print("-" * 80)
         print()
@@ -4,6 +4,7 @@
 """
 
 import pandas as pd
+from functools import cached_property
 from typing import Optional, Dict
 from .metrics import calculate_all_metrics
 from .report import ReportGenerator
@@ -31,7 +32,8 @@ class BacktestResult:
         strategy_name: str,
         symbol: str,
         risk_free_rate: float = 0.03,
-        trading_days: int = 252
+        trading_days: int = 252,
+        compute_metrics: bool = True
     ):
         self.equity_curve = equity_curve
         self.trades = trades
@@ -39,17 +41,22 @@ class BacktestResult:
         self.data = data
         self.strategy_name = strategy_name
         self.symbol = symbol
+        self.risk_free_rate = risk_free_rate
+        self.trading_days = trading_days
+        # False: 参数扫描等场景下完全跳过指标计算
+        self._compute_metrics = compute_metrics
 
-        # 计算所有指标
-        if not equity_curve.empty:
-            self.metrics: Dict[str, float] = calculate_all_metrics(
-                equity_curve=equity_curve['total_equity'],
-                trades=trades,
-                risk_free_rate=risk_free_rate,
-                trading_days=trading_days
-            )
-        else:
-            self.metrics = {}
+    @cached_property
+    def metrics(self) -> Dict[str, float]:
+        """所有绩效指标（首次访问时计算并缓存）"""
+        if not self._compute_metrics or self.equity_curve.empty:
+            return {}
+        return calculate_all_metrics(
+            equity_curve=self.equity_curve['total_equity'],
+            trades=self.trades,
+            risk_free_rate=self.risk_free_rate,
+            trading_days=self.trading_days
+        )
 
     def report(self) -> None:
         """打印绩效报告到控制台"""
@@ -94,7 +101,11 @@ class BacktestResult:
         return self.metrics.get(name)
 
     def to_csv(self, path: str) -> None:
-        """导出权益曲线和交易记录到 CSV"""
+        """
+        导出权益曲线和交易记录到 CSV。
+        只用 pandas 写入: pyarrow 的 CSV 写入器对日期、引号和浮点数的格式不同，
+        输出文件的格式不应取决于是否安装了 pyarrow。
+        """
         self.equity_curve.to_csv(f"{path}_equity.csv")
         self.trades.to_csv(f"{path}_trades.csv", index=False)
         print(f"已导出: {path}_equity.csv, {path}_trades.csv")
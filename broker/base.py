@@ -22,7 +22,7 @@ class Broker(ABC):
 
         参数:
             order: OrderEvent 订单事件
-            current_bar: 当前K线数据 (pd.Series)
+            current_bar: 当前K线数据 (BarData，可按属性读取 open/high/low/close/volume)
             portfolio: 组合管理器（用于检查资金/持仓）
 
         返回:
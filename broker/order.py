@@ -7,6 +7,8 @@ from dataclasses import dataclass
 from typing import Optional
 import pandas as pd
 
+from ..engine.constants import OrderType, OrderDirection
+
 
 class OrderStatus(Enum):
     """订单状态"""
@@ -16,26 +18,21 @@ class OrderStatus(Enum):
     REJECTED = "REJECTED"
 
 
-class OrderType(Enum):
-    """订单类型"""
-    MARKET = "MARKET"   # 市价单
-    LIMIT = "LIMIT"     # 限价单
-
-
-class OrderDirection(Enum):
-    """订单方向"""
-    BUY = "BUY"
-    SELL = "SELL"
+# 回测热路径使用的快捷常量（OrderType / OrderDirection 为整数枚举，见 engine/constants.py）
+MARKET = OrderType.MARKET
+LIMIT = OrderType.LIMIT
+BUY = OrderDirection.BUY
+SELL = OrderDirection.SELL
 
 
-@dataclass
+@dataclass(slots=True)
 class Order:
-    """完整的订单对象"""
+    """完整的订单对象（使用 __slots__，不创建实例 __dict__）"""
     order_id: int
     datetime: pd.Timestamp
     symbol: str
-    direction: str
-    order_type: str
+    direction: OrderDirection
+    order_type: OrderType
     quantity: int
     price: Optional[float] = None
     status: str = "PENDING"
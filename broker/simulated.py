@@ -6,6 +6,7 @@
 from typing import Optional
 from ..engine.event import FillEvent
 from .base import Broker
+from .order import MARKET, LIMIT, BUY, SELL
 
 
 class SimulatedBroker(Broker):
@@ -18,34 +19,29 @@ class SimulatedBroker(Broker):
         - 资金检查: 验证是否有足够资金/持仓
     """
 
-    def __init__(self):
-        self._order_count: int = 0
-
     def execute_order(self, order, current_bar, portfolio) -> Optional[FillEvent]:
         """
         模拟订单执行。
 
         参数:
             order: OrderEvent
-            current_bar: 当前K线 pd.Series (含 open/high/low/close/volume)
+            current_bar: 当前K线 BarData (按属性读取 open/high/low/close，pd.Series 同样适用)
             portfolio: Portfolio 组合管理器
         """
-        self._order_count += 1
-
         # 1. 确定基础成交价
-        if order.order_type == "MARKET":
-            fill_price = current_bar['close']
-        elif order.order_type == "LIMIT":
-            if order.direction == "BUY":
+        if order.order_type == MARKET:
+            fill_price = current_bar.close
+        elif order.order_type == LIMIT:
+            if order.direction == BUY:
                 # 买入限价单：限价 >= 当日最低价才能成交
-                if order.price < current_bar['low']:
+                if order.price < current_bar.low:
                     return None
-                fill_price = min(order.price, current_bar['close'])
+                fill_price = min(order.price, current_bar.close)
             else:
                 # 卖出限价单：限价 <= 当日最高价才能成交
-                if order.price > current_bar['high']:
+                if order.price > current_bar.high:
                     return None
-                fill_price = max(order.price, current_bar['close'])
+                fill_price = max(order.price, current_bar.close)
         else:
             return None
 
@@ -58,11 +54,11 @@ class SimulatedBroker(Broker):
         )
 
         # 4. 资金/持仓检查
-        if order.direction == "BUY":
+        if order.direction == BUY:
             cost = actual_price * order.quantity + commission
             if cost > portfolio.cash:
                 return None  # 资金不足
-        elif order.direction == "SELL":
+        elif order.direction == SELL:
             if order.quantity > portfolio.position:
                 return None  # 持仓不足
 
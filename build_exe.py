@@ -43,6 +43,7 @@ def main():
     prediction_file = os.path.join(BASE, 'prediction.py')
     storage_file = os.path.join(BASE, 'storage.py')
     init_file = os.path.join(BASE, '__init__.py')
+    jit_file = os.path.join(BASE, '_jit.py')
 
     cmd = [
         sys.executable, "-m", "PyInstaller",
@@ -55,6 +56,7 @@ def main():
         "--add-data", f"{prediction_file};quant_backtest",
         "--add-data", f"{storage_file};quant_backtest",
         "--add-data", f"{init_file};quant_backtest",
+        "--add-data", f"{jit_file};quant_backtest",
         # 隐式导入
         "--hidden-import", "flask",
         "--hidden-import", "flask_socketio",
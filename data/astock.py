@@ -43,6 +43,12 @@ class AStockData(DataLoader):
             end_date: "YYYY-MM-DD" 格式
             adjust: "qfq"(前复权) / "hfq"(后复权) / ""(不复权)
         """
+        # 命中本地缓存则直接返回，不再请求网络
+        cache_path = self._cache_path(symbol, start_date, end_date, adjust)
+        cached = self._read_cache(cache_path, self._cache_max_age(adjust))
+        if cached is not None:
+            return cached
+
         try:
             import akshare as ak
         except ImportError:
@@ -75,6 +81,7 @@ class AStockData(DataLoader):
         # 验证数据格式
         df = self.validate(df)
 
+        self._write_cache(cache_path, df)
         return df
 
     @staticmethod
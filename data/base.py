@@ -4,15 +4,25 @@
 统一返回格式：DatetimeIndex 的 DataFrame，列名为 ['open', 'high', 'low', 'close', 'volume']
 """
 
+import os
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Iterator
+from datetime import datetime
+from typing import Optional, Iterator, Tuple
+import numpy as np
 import pandas as pd
 
 
-@dataclass
+@dataclass(slots=True)
 class BarData:
-    """单根K线数据的标准化容器"""
+    """
+    单根K线数据的标准化容器。
+
+    回测主循环中用它代替 data.iloc[idx] 的 pd.Series: OHLCV 之外的列（如自行
+    添加的 'ma10'）放在 extra 中，bar['ma10'] / bar.ma10 / bar.get('ma10') 照常可用。
+    除此之外不支持 pd.Series 的其它方法，需要时用 ctx.get_history(1) 取 DataFrame。
+    """
     datetime: pd.Timestamp
     open: float
     high: float
@@ -20,6 +30,42 @@ class BarData:
     close: float
     volume: float
     amount: Optional[float] = None  # 成交额（A股特有）
+    extra: Optional[dict] = None    # 其余列 {列名: 值}
+
+    @property
+    def name(self) -> pd.Timestamp:
+        """K线日期，与 DataFrame 行 (pd.Series) 的 .name 含义一致"""
+        return self.datetime
+
+    def __getitem__(self, key):
+        """支持 bar['close'] 的写法，与 DataFrame 行的访问方式兼容"""
+        if key in _BAR_FIELDS:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __getattr__(self, key):
+        # 只有正常属性查找失败时才会调用，用于读取 extra 中的列
+        if key != 'extra':
+            extra = self.extra
+            if extra is not None and key in extra:
+                return extra[key]
+        raise AttributeError(f"'BarData' object has no attribute '{key}'")
+
+    def __contains__(self, key) -> bool:
+        return key in _BAR_FIELDS or (self.extra is not None and key in self.extra)
+
+    def get(self, key, default=None):
+        """同 pd.Series.get: 列不存在时返回 default"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+# 可以按 bar[key] 读取的固定字段（amount 为 None 时与原来的 Series 行一样返回 None）
+_BAR_FIELDS = frozenset(('open', 'high', 'low', 'close', 'volume', 'amount'))
 
 
 class DataLoader(ABC):
@@ -34,6 +80,11 @@ class DataLoader(ABC):
     # 标准列名
     REQUIRED_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
 
+    # 本地 Parquet 缓存目录（需要 pyarrow），设为 None 关闭缓存
+    cache_dir: Optional[str] = os.path.join(os.path.expanduser('~'), '.quant_backtest_cache')
+    # 前复权数据在之后每次除权除息时都会改写历史价格，缓存文件超过该秒数即重新获取
+    adjusted_cache_ttl: float = 24 * 3600
+
     @abstractmethod
     def load(
         self,
@@ -73,21 +124,108 @@ class DataLoader(ABC):
         # 去除 NaN 行
         df = df.dropna(subset=self.REQUIRED_COLUMNS)
 
-        # 确保数值类型
-        for col in self.REQUIRED_COLUMNS:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        # 确保数值类型（akshare/yfinance 返回的通常已是数值列，无需转换）
+        cols = self.REQUIRED_COLUMNS
+        if not all(pd.api.types.is_numeric_dtype(t) for t in df[cols].dtypes):
+            df[cols] = df[cols].apply(pd.to_numeric, errors='coerce')
 
         return df
 
+    def _cache_path(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        adjust: str
+    ) -> Optional[str]:
+        """
+        缓存文件路径，按 (数据源, 代码, 起止日期, 复权类型) 区分。
+        未启用缓存，或结束日期还未过去（数据仍会更新）时返回 None。
+        """
+        if not self.cache_dir:
+            return None
+        if end_date >= datetime.now().strftime("%Y-%m-%d"):
+            return None
+        name = f"{type(self).__name__}_{symbol}_{start_date}_{end_date}_{adjust or 'none'}.parquet"
+        return os.path.join(self.cache_dir, name)
+
+    def _cache_max_age(self, adjust: str) -> Optional[float]:
+        """缓存有效期（秒），None 表示不过期。只有前复权数据的历史价格会变化"""
+        return self.adjusted_cache_ttl if adjust == "qfq" else None
+
+    def _read_cache(
+        self, path: Optional[str], max_age: Optional[float] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        读取缓存（内存映射方式打开）。没有缓存、缓存已超过 max_age 秒时返回 None；
+        文件损坏（如写入时进程被终止）时删除该文件并返回 None，由调用方重新获取。
+        """
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+        try:
+            if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+                return None
+            return pq.read_table(path, memory_map=True).to_pandas()
+        except Exception:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _write_cache(self, path: Optional[str], df: pd.DataFrame) -> None:
+        """
+        写入缓存，pyarrow 未安装或写入失败时静默跳过。
+        先写临时文件再 os.replace 到最终路径，中途被终止不会留下不完整的缓存文件。
+        """
+        if path is None:
+            return
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_parquet(tmp, compression='zstd')
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
     def to_bar_iterator(self, df: pd.DataFrame) -> Iterator[BarData]:
         """将 DataFrame 转换为 BarData 逐行迭代器"""
-        for idx, row in df.iterrows():
+        cols = list(self.REQUIRED_COLUMNS)
+        has_amount = 'amount' in df.columns
+        if has_amount:
+            cols.append('amount')
+
+        # itertuples 直接产出原生元组，不像 iterrows 那样为每行构造 Series
+        for row in df[cols].itertuples(index=True, name=None):
             yield BarData(
-                datetime=idx,
-                open=row['open'],
-                high=row['high'],
-                low=row['low'],
-                close=row['close'],
-                volume=row['volume'],
-                amount=row.get('amount')
+                datetime=row[0],
+                open=row[1],
+                high=row[2],
+                low=row[3],
+                close=row[4],
+                volume=row[5],
+                amount=row[6] if has_amount else None
             )
+
+    def to_ndarray(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将 DataFrame 转换为 (日期数组, OHLCV 二维数组)，供向量化策略使用。
+
+        返回:
+            datetimes: datetime64[ns] 一维数组
+            ohlcv: float64 二维数组，列顺序为 open/high/low/close/volume
+        """
+        datetimes = df.index.to_numpy()
+        ohlcv = df[self.REQUIRED_COLUMNS].to_numpy(dtype=np.float64)
+        return datetimes, ohlcv
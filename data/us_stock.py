@@ -3,6 +3,8 @@
 从 Yahoo Finance 获取历史行情数据。
 """
 
+from typing import Optional
+
 import pandas as pd
 from .base import DataLoader
 
@@ -16,6 +18,10 @@ class USStockData(DataLoader):
         df = loader.load("AAPL", "2020-01-01", "2024-01-01")
     """
 
+    def _cache_max_age(self, adjust: str) -> Optional[float]:
+        """yfinance 总是返回复权价（auto_adjust），与 adjust 参数无关，缓存一律按有效期过期"""
+        return self.adjusted_cache_ttl
+
     def load(
         self,
         symbol: str,
@@ -32,6 +38,11 @@ class USStockData(DataLoader):
             end_date: "YYYY-MM-DD" 格式
             adjust: 默认自动复权
         """
+        cache_path = self._cache_path(symbol, start_date, end_date, adjust)
+        cached = self._read_cache(cache_path, self._cache_max_age(adjust))
+        if cached is not None:
+            return cached
+
         try:
             import yfinance as yf
         except ImportError:
@@ -60,4 +71,5 @@ class USStockData(DataLoader):
         # 验证数据格式
         df = self.validate(df)
 
+        self._write_cache(cache_path, df)
         return df
@@ -0,0 +1,141 @@
+"""
+向量化回测内核。
+
+适用于信号可以一次性算成布尔数组的策略（见 Strategy.vectorized_signals）。
+内核按K线顺序遍历收盘价数组，按与事件驱动路径相同的规则撮合市价单:
+    - 买入: 空仓且 buy_mask 为 True 时，用 95% 资金按收盘价全仓买入（A股按手取整）
+    - 卖出: 有持仓且 sell_mask 为 True 时，卖出全部持仓
+    - 滑点、佣金、最低佣金、印花税与 Portfolio 的计算方式一致
+
+安装了 numba 时编译为机器码（cache=True，编译结果缓存到磁盘），否则以纯 Python 运行。
+
+buy_all / sell_all 是 Portfolio 成交计算（滑点、手续费、资金检查）的编译版本，
+只使用标量参数（方向用 1/-1 表示，不传字符串），可在其他 numba 内核中直接调用
+（如 engine/grid.py）。事件驱动路径仍使用 Portfolio: 每笔成交从 Python 调用一次
+编译函数的装箱开销与这几次浮点运算本身相当，编译并不能带来收益。
+"""
+
+import numpy as np
+
+from .._jit import njit
+
+
+@njit(cache=True)
+def buy_all(price, cash, commission_rate, slippage, min_commission, market_is_a):
+    """
+    按收盘价全仓买入（95% 资金，A股按手取整）。
+    返回 (数量, 成交价, 手续费)；资金不足或数量为 0 时数量返回 0。
+    """
+    quantity = 0
+    if price > 0:
+        quantity = int(cash * 0.95 / price)
+        if market_is_a:
+            quantity = (quantity // 100) * 100
+    if quantity <= 0:
+        return 0, 0.0, 0.0
+    actual = price * (1 + slippage)
+    amount = actual * quantity
+    if market_is_a:
+        commission = max(amount * commission_rate, min_commission)
+    else:
+        commission = amount * commission_rate
+    if amount + commission > cash:
+        return 0, 0.0, 0.0
+    return quantity, actual, commission
+
+
+@njit(cache=True)
+def sell_all(price, quantity, commission_rate, slippage, stamp_tax,
+             min_commission, market_is_a):
+    """按收盘价卖出全部持仓，返回 (成交价, 手续费)"""
+    actual = price * (1 - slippage)
+    amount = actual * quantity
+    if market_is_a:
+        commission = max(amount * commission_rate, min_commission)
+        commission += amount * stamp_tax
+    else:
+        commission = amount * commission_rate
+    return actual, commission
+
+
+@njit(cache=True)
+def run_core(
+    close,
+    buy_mask,
+    sell_mask,
+    capital,
+    commission_rate,
+    slippage,
+    stamp_tax,
+    min_commission,
+    market_is_a
+):
+    """
+    逐根K线撮合，返回每日资金状态和交易记录。
+
+    返回:
+        equity_arr, cash_arr, pos_arr: 每根K线收盘后的总资产 / 现金 / 持仓
+        trade_idx: 成交所在K线下标
+        trade_px, trade_qty, trade_dir: 成交价（含滑点）/ 数量 / 方向（1=买, -1=卖）
+        trade_comm, trade_slip: 手续费 / 滑点成本
+    """
+    n = close.shape[0]
+    equity_arr = np.empty(n)
+    cash_arr = np.empty(n)
+    pos_arr = np.empty(n, dtype=np.int64)
+
+    # 每根K线最多成交一笔，交易记录长度不会超过 n
+    trade_idx = np.empty(n, dtype=np.int64)
+    trade_px = np.empty(n)
+    trade_qty = np.empty(n, dtype=np.int64)
+    trade_dir = np.empty(n, dtype=np.int8)
+    trade_comm = np.empty(n)
+    trade_slip = np.empty(n)
+    n_trades = 0
+
+    cash = capital
+    position = 0
+
+    for i in range(n):
+        price = close[i]
+
+        if position == 0 and buy_mask[i]:
+            quantity, actual, commission = buy_all(
+                price, cash, commission_rate, slippage, min_commission, market_is_a
+            )
+            if quantity > 0:
+                cash -= actual * quantity + commission
+                position = quantity
+                trade_idx[n_trades] = i
+                trade_px[n_trades] = actual
+                trade_qty[n_trades] = quantity
+                trade_dir[n_trades] = 1
+                trade_comm[n_trades] = commission
+                trade_slip[n_trades] = abs(actual - price) * quantity
+                n_trades += 1
+
+        elif position > 0 and sell_mask[i]:
+            quantity = position
+            actual, commission = sell_all(
+                price, quantity, commission_rate, slippage, stamp_tax,
+                min_commission, market_is_a
+            )
+            cash += actual * quantity - commission
+            position = 0
+            trade_idx[n_trades] = i
+            trade_px[n_trades] = actual
+            trade_qty[n_trades] = quantity
+            trade_dir[n_trades] = -1
+            trade_comm[n_trades] = commission
+            trade_slip[n_trades] = abs(actual - price) * quantity
+            n_trades += 1
+
+        cash_arr[i] = cash
+        pos_arr[i] = position
+        equity_arr[i] = cash + position * price
+
+    return (
+        equity_arr, cash_arr, pos_arr,
+        trade_idx[:n_trades], trade_px[:n_trades], trade_qty[:n_trades],
+        trade_dir[:n_trades], trade_comm[:n_trades], trade_slip[:n_trades],
+    )
@@ -0,0 +1,36 @@
+"""
+交易方向和订单类型的整数编码。
+
+回测热路径中的方向/类型比较都是整数比较；也可以直接作为整数传入 numba 内核。
+str() 和 f-string 输出名称 "BUY" / "SELL" / "MARKET" / "LIMIT"（与原来的字符串常量一致），
+也可以用 .name 读取。
+本模块不依赖其他模块，事件、订单、组合都从这里导入，避免循环引用。
+"""
+
+from enum import IntEnum
+
+
+class _NamedIntEnum(IntEnum):
+    """
+    按名称输出的整数枚举。
+    Python 3.11 起 IntEnum 的 str() / format() 输出整数值，用户策略中打印成交方向的
+    日志会从 "BUY" 变成 "0"，这里统一改为输出名称
+    """
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.name, format_spec)
+
+
+class OrderType(_NamedIntEnum):
+    """订单类型"""
+    MARKET = 0   # 市价单
+    LIMIT = 1    # 限价单
+
+
+class OrderDirection(_NamedIntEnum):
+    """订单方向"""
+    BUY = 0
+    SELL = 1
@@ -15,14 +15,20 @@
     result.plot()
 """
 
-from collections import deque
-from typing import Optional
+import inspect
+from itertools import product
+from typing import Dict, Optional, Sequence
+import numpy as np
 import pandas as pd
 
 from .event import EventType, MarketEvent, SignalEvent, OrderEvent, FillEvent
 from .portfolio import Portfolio
+from ._core import run_core
+from .grid import run_sma_grid
 from ..broker.base import Broker
 from ..broker.simulated import SimulatedBroker
+from ..broker.order import BUY, SELL
+from ..data.base import BarData, DataLoader
 
 
 class BacktestEngine:
@@ -56,8 +62,23 @@ class BacktestEngine:
         self.symbol = symbol
         self.market = market
 
-        # 事件队列
-        self.event_queue: deque = deque()
+        # 每手股数: A股按100股(一手)取整，美股可按1股交易
+        self._lot_size = 100 if market == "A" else 1
+
+        # 同步模式（默认）: 单标的回测每根K线只有 信号->订单->成交 一条短链，
+        # 直接按顺序调用各处理函数，不经过事件队列。设为 False 时使用事件队列。
+        self._sync_mode: bool = True
+        self._pending_signals: list = []
+
+        # 事件队列（仅非同步模式使用）: 每根K线只有少量事件，用列表 + 队头下标
+        # 实现先进先出，每根K线处理完后清空
+        self.event_queue: list = []
+        self._ev_head: int = 0
+
+        # 当前K线（主循环中更新，供策略下单时读取日期）
+        self._current_bar: Optional[BarData] = None
+        # on_bar 是否接受下标参数，主循环开始前检查一次
+        self._pass_idx: bool = False
 
         # 组合管理器
         self.portfolio = Portfolio(
@@ -88,26 +109,19 @@ class BacktestEngine:
         # 1. 策略初始化（预计算指标等）
         self.strategy.init()
 
-        # 2. 逐根K线推送
-        total_bars = len(self.data)
-        for idx in range(total_bars):
-            self._context._current_idx = idx
-            bar = self.data.iloc[idx]
-
-            # 2a. 生成市场事件
-            market_event = MarketEvent(datetime=bar.name)
-            self.event_queue.append(market_event)
-
-            # 2b. 处理事件队列（可能产生连锁事件）
-            while self.event_queue:
-                event = self.event_queue.popleft()
-                self._process_event(event, bar)
-
-            # 2c. 更新当日权益
-            self.portfolio.update_market_value(
-                datetime=bar.name,
-                close_price=bar['close']
-            )
+        # 预先取出 OHLCV 数组，主循环和向量化内核都只读取该数组
+        self._ohlcv = self.data[DataLoader.REQUIRED_COLUMNS].to_numpy(dtype=float)
+
+        # 2. 策略提供了向量化信号、回调未被子类覆写且使用默认经纪商时，
+        #    走编译内核一次算完
+        signals = None
+        if type(self.broker) is SimulatedBroker and self.strategy._vectorized_owner() is not None:
+            signals = self.strategy.vectorized_signals(self.data)
+
+        if signals is not None:
+            self._run_vectorized(*signals)
+        else:
+            self._run_events()
 
         # 3. 构建回测结果
         return BacktestResult(
@@ -119,6 +133,199 @@ class BacktestEngine:
             symbol=self.symbol
         )
 
+    def run_grid(self, param_grid: Dict[str, Sequence[int]]) -> pd.DataFrame:
+        """
+        双均线参数网格批量回测（需使用 SMACrossStrategy，且未覆写 on_bar /
+        on_order_filled / vectorized_signals）。
+
+        所有参数组合在一次编译内核调用中并行回测（见 engine/grid.py），
+        不逐个构建 BacktestResult，适合大规模参数寻优。
+
+        参数:
+            param_grid: {'short_period': [...], 'long_period': [...]}，取笛卡尔积；
+                        缺省的键使用当前策略的参数，短周期 >= 长周期的组合会被跳过
+
+        返回:
+            DataFrame，每行一个组合: short_period, long_period 及各项绩效指标
+        """
+        from ..analysis.metrics import calculate_all_metrics_batch
+        from ..strategy.sma_cross import SMACrossStrategy
+
+        # 网格内核按 SMACrossStrategy 自身的金叉/死叉规则撮合，覆写了回调的子类不适用
+        if self.strategy._vectorized_owner() is not SMACrossStrategy:
+            raise TypeError(
+                "run_grid 目前只支持 SMACrossStrategy（不含覆写了 on_bar / on_order_filled 的子类）"
+            )
+
+        shorts = param_grid.get('short_period', [self.strategy.short_period])
+        longs = param_grid.get('long_period', [self.strategy.long_period])
+        combos = [(s, l) for s, l in product(shorts, longs) if s < l]
+        if not combos:
+            raise ValueError("param_grid 中没有有效的 (short_period < long_period) 组合")
+
+        short_periods = np.array([c[0] for c in combos], dtype=np.int64)
+        long_periods = np.array([c[1] for c in combos], dtype=np.int64)
+
+        portfolio = self.portfolio
+        equity_curves, n_round_trips = run_sma_grid(
+            self.data['close'].to_numpy(dtype=np.float64),
+            float(portfolio.initial_capital),
+            float(portfolio.commission_rate),
+            float(portfolio.slippage),
+            float(portfolio.stamp_tax),
+            float(portfolio.min_commission),
+            self.market == "A",
+            short_periods,
+            long_periods
+        )
+
+        metrics = calculate_all_metrics_batch(equity_curves)
+        metrics['总交易次数'] = n_round_trips
+        metrics.insert(0, 'short_period', short_periods)
+        metrics.insert(1, 'long_period', long_periods)
+        return metrics
+
+    def _run_events(self) -> None:
+        """事件驱动主循环：逐根K线推送"""
+        # 循环前一次性取出日期和 OHLCV 标量，每根K线只构造一个轻量 BarData，
+        # 不再通过 data.iloc[idx] 为每行构造 pd.Series
+        timestamps = list(self.data.index)
+        rows = self._ohlcv.tolist()
+        amounts = self.data['amount'].tolist() if 'amount' in self.data.columns else None
+        # OHLCV / amount 之外的列（策略自行添加的指标等）按行放进 BarData.extra
+        skip = set(DataLoader.REQUIRED_COLUMNS)
+        skip.add('amount')
+        extra_cols = [col for col in self.data.columns if col not in skip]
+        extras = self.data[extra_cols].to_dict('records') if extra_cols else None
+
+        portfolio = self.portfolio
+        ctx = self._context
+        on_bar = self.strategy.on_bar
+        pass_idx = self._pass_idx = self._on_bar_takes_idx()
+        for idx in range(len(timestamps)):
+            ctx._current_idx = idx
+            portfolio._bar_idx = idx
+            o, h, l, c, v = rows[idx]
+            bar = BarData(timestamps[idx], o, h, l, c, v,
+                          amounts[idx] if amounts is not None else None,
+                          extras[idx] if extras is not None else None)
+            self._current_bar = bar
+
+            if self._sync_mode:
+                # 2a/2b. 直接调用策略，再处理其发出的信号
+                if pass_idx:
+                    on_bar(bar, idx)
+                else:
+                    on_bar(bar)
+                if self._pending_signals:
+                    self._process_signals(bar)
+            else:
+                # 2a. 生成市场事件
+                market_event = MarketEvent(datetime=bar.datetime)
+                self.event_queue.append(market_event)
+
+                # 2b. 处理事件队列（可能产生连锁事件）
+                events = self.event_queue
+                while self._ev_head < len(events):
+                    event = events[self._ev_head]
+                    self._ev_head += 1
+                    self._process_event(event, bar)
+                events.clear()
+                self._ev_head = 0
+
+        # 2c. 权益曲线只依赖成交时的资金/持仓变动，循环结束后一次性计算
+        portfolio.build_equity_curve(self.data.index.to_numpy(), self._ohlcv[:, 3])
+
+    def _on_bar_takes_idx(self) -> bool:
+        """策略的 on_bar 是否接受第二个参数 idx（旧策略只声明了 on_bar(self, bar)）"""
+        try:
+            params = inspect.signature(self.strategy.on_bar).parameters.values()
+        except (TypeError, ValueError):
+            return False
+        positional = 0
+        for p in params:
+            if p.kind == p.VAR_POSITIONAL:
+                return True
+            if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD):
+                positional += 1
+        return positional >= 2
+
+    def _run_vectorized(self, buy_mask, sell_mask) -> None:
+        """
+        向量化路径：由 run_core 一次性完成撮合，再把结果写回 Portfolio，
+        之后的 get_equity_df / get_trades_df 与事件驱动路径完全一致。
+        该路径不会回调 on_bar / on_order_filled。
+        """
+        portfolio = self.portfolio
+        close = self._ohlcv[:, 3]
+        (equity, cash, position,
+         trade_idx, trade_px, trade_qty, trade_dir,
+         trade_comm, trade_slip) = run_core(
+            close,
+            np.asarray(buy_mask, dtype=np.bool_),
+            np.asarray(sell_mask, dtype=np.bool_),
+            float(portfolio.initial_capital),
+            float(portfolio.commission_rate),
+            float(portfolio.slippage),
+            float(portfolio.stamp_tax),
+            float(portfolio.min_commission),
+            self.market == "A"
+        )
+
+        index = self.data.index
+        timestamps = index.to_numpy()
+        portfolio._store_trades(
+            timestamps[trade_idx],
+            self.symbol,
+            np.where(trade_dir > 0, int(BUY), int(SELL)),
+            trade_px,
+            trade_qty,
+            trade_comm,
+            trade_slip
+        )
+
+        portfolio._store_equity(timestamps, cash, position, close)
+
+        # 同步期末状态（只在空仓时买入，持仓均价即最后一笔买入价）
+        if len(index):
+            portfolio.cash = float(cash[-1])
+            portfolio.position = int(position[-1])
+            portfolio.position_avg_cost = float(trade_px[-1]) if portfolio.position > 0 else 0.0
+
+    def submit_signal(self, signal: SignalEvent) -> None:
+        """接收策略发出的信号：同步模式下暂存，否则放入事件队列"""
+        if self._sync_mode:
+            self._pending_signals.append(signal)
+        else:
+            self.event_queue.append(signal)
+
+    def _process_signals(self, bar) -> None:
+        """
+        同步模式下处理本根K线的信号。
+        按 信号 -> 订单 -> 成交 逐层处理，与事件队列的先进先出顺序一致
+        （同一层的事件全部处理完才进入下一层）；
+        on_order_filled 中新发出的信号在下一轮处理。
+        """
+        pending = self._pending_signals
+        while pending:
+            signals = pending[:]
+            pending.clear()
+
+            orders = []
+            for signal in signals:
+                order = self._signal_to_order(signal, bar)
+                if order is not None:
+                    orders.append(order)
+
+            fills = []
+            for order in orders:
+                fill = self.broker.execute_order(order, bar, self.portfolio)
+                if fill is not None:
+                    fills.append(fill)
+
+            for fill in fills:
+                self._handle_fill(fill)
+
     def _process_event(self, event, current_bar) -> None:
         """根据事件类型分发处理"""
         if event.type == EventType.MARKET:
@@ -132,19 +339,28 @@ class BacktestEngine:
 
     def _handle_market(self, event, bar) -> None:
         """处理市场事件：调用策略的 on_bar"""
-        self.strategy.on_bar(bar)
+        if self._pass_idx:
+            self.strategy.on_bar(bar, self._context._current_idx)
+        else:
+            self.strategy.on_bar(bar)
 
     def _handle_signal(self, signal: SignalEvent, bar) -> None:
         """处理信号事件：转换为订单事件"""
+        order = self._signal_to_order(signal, bar)
+        if order is not None:
+            self.event_queue.append(order)
+
+    def _signal_to_order(self, signal: SignalEvent, bar) -> Optional[OrderEvent]:
+        """根据信号生成订单，数量为 0 时返回 None"""
         quantity = signal.volume
         if quantity <= 0:
             # 如果信号未指定数量，自动计算
-            quantity = self._calculate_order_quantity(signal, bar)
+            quantity = self._calculate_order_quantity(signal.direction, bar.close)
 
         if quantity <= 0:
-            return
+            return None
 
-        order = OrderEvent(
+        return OrderEvent(
             datetime=signal.datetime,
             symbol=signal.symbol,
             direction=signal.direction,
@@ -152,7 +368,6 @@ class BacktestEngine:
             quantity=quantity,
             price=signal.limit_price
         )
-        self.event_queue.append(order)
 
     def _handle_order(self, order: OrderEvent, bar) -> None:
         """处理订单事件：交给 Broker 执行"""
@@ -165,27 +380,23 @@ class BacktestEngine:
         self.portfolio.execute_fill(fill)
         self.strategy.on_order_filled(fill)
 
-    def _calculate_order_quantity(self, signal: SignalEvent, bar) -> int:
+    def _calculate_order_quantity(self, direction, close_price: float) -> int:
         """
-        根据信号计算下单数量。
+        根据信号方向和当前收盘价计算下单数量。
 
         买入: 使用 95% 可用资金全仓买入
         卖出: 卖出全部持仓
         A股: 按100股(一手)取整
         """
-        if signal.direction == "SELL":
-            return self.portfolio.position
+        portfolio = self.portfolio
+        if direction == SELL:
+            return portfolio.position
 
-        # 买入数量计算
-        available = self.portfolio.cash * 0.95  # 预留 5% 资金
-        price = bar['close']
-        if price <= 0:
+        if close_price <= 0:
             return 0
 
-        quantity = int(available / price)
-
-        # A股按手取整（100股的整数倍）
-        if self.market == "A":
-            quantity = (quantity // 100) * 100
+        # 买入数量计算（预留 5% 资金），按每手股数取整
+        quantity = int(portfolio.cash * 0.95 / close_price)
+        quantity -= quantity % self._lot_size
 
         return max(quantity, 0)
@@ -7,10 +7,12 @@
 """
 
 from enum import Enum
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Optional
 import pandas as pd
 
+from .constants import OrderDirection, OrderType
+
 
 class EventType(Enum):
     """事件类型枚举"""
@@ -20,56 +22,56 @@ class EventType(Enum):
     FILL = "FILL"       # 成交事件（Broker 执行结果）
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketEvent:
     """
     市场数据事件。
     当新的一根K线数据到达时由引擎产生。
     """
-    type: EventType = field(default=EventType.MARKET, init=False)
+    type = EventType.MARKET   # 类属性（不是字段），每种事件固定，不占实例存储
     datetime: pd.Timestamp = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SignalEvent:
     """
     策略产生的交易信号。
     由策略的 on_bar() 方法通过 buy()/sell() 间接生成。
     """
-    type: EventType = field(default=EventType.SIGNAL, init=False)
+    type = EventType.SIGNAL
     datetime: pd.Timestamp = None
     symbol: str = ""
-    direction: str = ""          # "BUY" / "SELL"
+    direction: Optional[OrderDirection] = None   # BUY / SELL
     volume: int = 0              # 下单数量
-    order_type: str = "MARKET"   # "MARKET" / "LIMIT"
+    order_type: OrderType = OrderType.MARKET     # MARKET / LIMIT
     limit_price: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderEvent:
     """
     发送给 Broker 的订单。
     由引擎根据 SignalEvent 生成，包含具体的数量和价格。
     """
-    type: EventType = field(default=EventType.ORDER, init=False)
+    type = EventType.ORDER
     datetime: pd.Timestamp = None
     symbol: str = ""
-    direction: str = ""          # "BUY" / "SELL"
-    order_type: str = "MARKET"   # "MARKET" / "LIMIT"
+    direction: Optional[OrderDirection] = None   # BUY / SELL
+    order_type: OrderType = OrderType.MARKET     # MARKET / LIMIT
     quantity: int = 0
     price: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FillEvent:
     """
     订单成交事件。
     由 Broker 执行后返回，包含实际成交的价格和费用。
     """
-    type: EventType = field(default=EventType.FILL, init=False)
+    type = EventType.FILL
     datetime: pd.Timestamp = None
     symbol: str = ""
-    direction: str = ""          # "BUY" / "SELL"
+    direction: Optional[OrderDirection] = None   # BUY / SELL
     quantity: int = 0
     fill_price: float = 0.0
     commission: float = 0.0      # 手续费
@@ -0,0 +1,88 @@
+"""
+参数网格批量回测（双均线交叉）。
+
+一次调用对所有 (短周期, 长周期) 组合并行回测:
+    - 每个组合独立扫描收盘价，均线用滚动和增量计算（每根K线 O(1)）
+    - 交易规则与 SMACrossStrategy + 向量化内核一致（金叉空仓买入、死叉清仓）
+    - 安装了 numba 时按组合并行（prange），否则逐个组合以纯 Python 运行
+
+一般通过 BacktestEngine.run_grid 调用。
+"""
+
+import numpy as np
+
+from .._jit import njit, prange
+from ._core import buy_all, sell_all
+
+
+@njit(parallel=True, cache=True)
+def run_sma_grid(
+    close,
+    capital,
+    commission_rate,
+    slippage,
+    stamp_tax,
+    min_commission,
+    market_is_a,
+    short_periods,
+    long_periods
+):
+    """
+    返回:
+        equity_curves: (组合数, K线数) 每个组合每根K线收盘后的总资产
+        n_round_trips: 每个组合完成的买卖回合数
+    """
+    n_combos = short_periods.shape[0]
+    n_bars = close.shape[0]
+    equity_curves = np.empty((n_combos, n_bars))
+    n_round_trips = np.zeros(n_combos, dtype=np.int64)
+
+    for k in prange(n_combos):
+        short_p = short_periods[k]
+        long_p = long_periods[k]
+        short_sum = 0.0
+        long_sum = 0.0
+        short_prev = np.nan
+        long_prev = np.nan
+        cash = capital
+        position = 0
+
+        for i in range(n_bars):
+            price = close[i]
+
+            # 滚动和: 加入新值，移出窗口外的旧值
+            short_sum += price
+            if i >= short_p:
+                short_sum -= close[i - short_p]
+            long_sum += price
+            if i >= long_p:
+                long_sum -= close[i - long_p]
+            short_now = short_sum / short_p if i >= short_p - 1 else np.nan
+            long_now = long_sum / long_p if i >= long_p - 1 else np.nan
+
+            # 与 SMACrossStrategy.on_bar 相同: 等待长期均线数据充分后判断交叉
+            if i >= long_p:
+                if short_prev <= long_prev and short_now > long_now:
+                    if position == 0:
+                        quantity, actual, commission = buy_all(
+                            price, cash, commission_rate, slippage,
+                            min_commission, market_is_a
+                        )
+                        if quantity > 0:
+                            cash -= actual * quantity + commission
+                            position = quantity
+                elif short_prev >= long_prev and short_now < long_now:
+                    if position > 0:
+                        actual, commission = sell_all(
+                            price, position, commission_rate, slippage, stamp_tax,
+                            min_commission, market_is_a
+                        )
+                        cash += actual * position - commission
+                        position = 0
+                        n_round_trips[k] += 1
+
+            short_prev = short_now
+            long_prev = long_now
+            equity_curves[k, i] = cash + position * price
+
+    return equity_curves, n_round_trips
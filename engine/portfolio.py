@@ -5,16 +5,19 @@
 """
 
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Optional
+import numpy as np
 import pandas as pd
 
+from ..broker.order import BUY, SELL, OrderDirection
 
-@dataclass
+
+@dataclass(slots=True)
 class Trade:
     """单笔交易记录"""
     datetime: pd.Timestamp
     symbol: str
-    direction: str       # "BUY" / "SELL"
+    direction: OrderDirection   # BUY / SELL
     price: float         # 实际成交价（含滑点）
     quantity: int
     commission: float    # 手续费
@@ -38,6 +41,9 @@ class Portfolio:
         market: "A"=A股, "US"=美股
     """
 
+    # 成交记录矩阵 _tr_buf 的列
+    _TRADE_COLUMNS = ('direction', 'price', 'quantity', 'commission', 'slippage')
+
     def __init__(
         self,
         initial_capital: float = 100000.0,
@@ -55,26 +61,82 @@ class Portfolio:
         self.stamp_tax = stamp_tax
         self.market = market
 
+        # 市场和费率在组合生命周期内固定，构造时一次性绑定专用的计算函数，
+        # 撮合时不再判断市场类型、读取费率属性
+        self._commission = self._make_commission_fn()
+        self._slip_buy = 1 + slippage
+        self._slip_sell = 1 - slippage
+
         # 持仓状态
         self.position: int = 0           # 持仓数量
         self.position_avg_cost: float = 0.0  # 持仓均价
 
-        # 历史记录
-        self.trades: List[Trade] = []
-        self.equity_curve: List[Dict] = []
+        # 资金/持仓变动记录 (K线下标, 现金, 持仓)，只在成交时追加，
+        # 回测结束后由 build_equity_curve 展开为整条权益曲线
+        self._bar_idx: int = 0
+        self._changes: list = []
+
+        # get_trades_df / get_equity_df 的缓存: 回测结束后报告、画图、导出多次读取时只构建一次。
+        # 交易记录缓存按成交笔数判断是否过期，权益曲线缓存在写入时清空
+        self._trades_df: Optional[pd.DataFrame] = None
+        self._trades_df_len: int = -1
+        self._equity_df: Optional[pd.DataFrame] = None
+
+        # 权益曲线和成交记录都按列存放在预分配数组中（见 prepare），
+        # get_equity_df / get_trades_df 时直接包装
+        self.prepare(0)
+
+    def prepare(self, n_bars: int) -> None:
+        """
+        按K线数量预分配权益曲线数组，由引擎在主循环前调用。
+        未调用或记录数超过预分配长度时，数组会自动扩容。
+        """
+        self._eq_ts = np.empty(n_bars, dtype='datetime64[ns]')
+        self._eq_cash = np.empty(n_bars)
+        self._eq_mv = np.empty(n_bars)
+        self._eq_total = np.empty(n_bars)
+        self._eq_pos = np.empty(n_bars, dtype=np.int64)
+        self._eq_i = 0
+        self._equity_df = None
+
+        # 成交记录: 时间单独一列（纳秒整数超出 float64 精度），
+        # 其余字段放在一个 float64 矩阵中，列为 _TRADE_COLUMNS；方向存 OrderDirection 整数值
+        self._tr_ts = np.empty(n_bars, dtype='datetime64[ns]')
+        self._tr_buf = np.empty((n_bars, len(self._TRADE_COLUMNS)))
+        self._tr_syms: list = []
+        self._n_trades = 0
+        self._trades_df = None
+        self._trades_df_len = -1
+
+    def _grow_trades(self) -> None:
+        """成交记录数组扩容为原来的两倍"""
+        size = max(2 * len(self._tr_ts), 64)
+        ts = np.empty(size, dtype=self._tr_ts.dtype)
+        ts[:len(self._tr_ts)] = self._tr_ts
+        buf = np.empty((size, self._tr_buf.shape[1]))
+        buf[:len(self._tr_buf)] = self._tr_buf
+        self._tr_ts = ts
+        self._tr_buf = buf
 
-    def calculate_slippage(self, price: float, direction: str) -> float:
+    def _grow(self) -> None:
+        """权益曲线数组扩容为原来的两倍"""
+        size = max(2 * len(self._eq_cash), 64)
+        for name in ('_eq_ts', '_eq_cash', '_eq_mv', '_eq_total', '_eq_pos'):
+            old = getattr(self, name)
+            new = np.empty(size, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def calculate_slippage(self, price: float, direction: OrderDirection) -> float:
         """
         计算滑点后的实际成交价。
         买入时价格上滑，卖出时价格下滑。
         """
-        if direction == "BUY":
-            return round(price * (1 + self.slippage), 4)
-        else:
-            return round(price * (1 - self.slippage), 4)
+        factor = self._slip_buy if direction == BUY else self._slip_sell
+        return price * factor
 
     def calculate_commission(
-        self, price: float, quantity: int, direction: str
+        self, price: float, quantity: int, direction: OrderDirection
     ) -> float:
         """
         计算交易手续费。
@@ -85,16 +147,25 @@ class Portfolio:
         美股:
             佣金 = 成交额 * 费率（无最低限制）
         """
-        trade_amount = price * quantity
+        return self._commission(price, quantity, direction)
 
+    def _make_commission_fn(self):
+        """按市场生成手续费函数，费率作为默认参数捕获为局部变量"""
         if self.market == "A":
-            commission = max(trade_amount * self.commission_rate, self.min_commission)
-            if direction == "SELL":
-                commission += trade_amount * self.stamp_tax
+            def _commission(price, quantity, direction,
+                            cr=self.commission_rate, mc=self.min_commission,
+                            st=self.stamp_tax, sell=SELL):
+                amount = price * quantity
+                commission = amount * cr
+                if commission < mc:
+                    commission = mc
+                if direction == sell:
+                    commission += amount * st
+                return commission
         else:
-            commission = trade_amount * self.commission_rate
-
-        return round(commission, 2)
+            def _commission(price, quantity, direction, cr=self.commission_rate):
+                return price * quantity * cr
+        return _commission
 
     def execute_fill(self, fill_event) -> bool:
         """
@@ -108,7 +179,7 @@ class Portfolio:
         """
         cost = fill_event.fill_price * fill_event.quantity
 
-        if fill_event.direction == "BUY":
+        if fill_event.direction == BUY:
             total_cost = cost + fill_event.commission
             if total_cost > self.cash:
                 return False
@@ -122,7 +193,7 @@ class Portfolio:
             # 扣减资金
             self.cash -= total_cost
 
-        elif fill_event.direction == "SELL":
+        elif fill_event.direction == SELL:
             if fill_event.quantity > self.position:
                 return False
 
@@ -135,58 +206,163 @@ class Portfolio:
             if self.position == 0:
                 self.position_avg_cost = 0.0
 
-        # 记录交易
-        self.trades.append(Trade(
-            datetime=fill_event.datetime,
-            symbol=fill_event.symbol,
-            direction=fill_event.direction,
-            price=fill_event.fill_price,
-            quantity=fill_event.quantity,
-            commission=fill_event.commission,
-            slippage=fill_event.slippage_cost
-        ))
+        self._changes.append((self._bar_idx, self.cash, self.position))
+
+        # 记录交易（写入预分配数组的下一行）
+        i = self._n_trades
+        if i == len(self._tr_ts):
+            self._grow_trades()
+        self._tr_ts[i] = fill_event.datetime
+        self._tr_buf[i] = (
+            fill_event.direction,
+            fill_event.fill_price,
+            fill_event.quantity,
+            fill_event.commission,
+            fill_event.slippage_cost
+        )
+        self._tr_syms.append(fill_event.symbol)
+        self._n_trades = i + 1
 
         return True
 
+    def _store_trades(
+        self,
+        timestamps: np.ndarray,
+        symbol: str,
+        direction: np.ndarray,
+        price: np.ndarray,
+        quantity: np.ndarray,
+        commission: np.ndarray,
+        slippage: np.ndarray
+    ) -> None:
+        """以整列数组写入成交记录（direction 为 OrderDirection 整数值）"""
+        n = len(timestamps)
+        self._tr_ts = np.asarray(timestamps, dtype='datetime64[ns]')
+        self._tr_buf = np.column_stack(
+            (direction, price, quantity, commission, slippage)
+        ).astype(np.float64)
+        self._tr_syms = [symbol] * n
+        self._n_trades = n
+        self._trades_df_len = -1
+
+    @property
+    def trades(self) -> List[Trade]:
+        """成交记录列表（按需由成交数组构建）"""
+        n = self._n_trades
+        ts = pd.DatetimeIndex(self._tr_ts[:n])
+        return [
+            Trade(
+                datetime=ts[i],
+                symbol=self._tr_syms[i],
+                direction=OrderDirection(int(row[0])),
+                price=float(row[1]),
+                quantity=int(row[2]),
+                commission=float(row[3]),
+                slippage=float(row[4])
+            )
+            for i, row in enumerate(self._tr_buf[:n].tolist())
+        ]
+
     def update_market_value(
         self, datetime: pd.Timestamp, close_price: float
     ) -> None:
         """
         每根K线结束后更新组合市值，记录权益曲线点。
         总资产 = 现金 + 持仓市值
+        （单独使用 Portfolio 时逐根调用；引擎改用 build_equity_curve 一次性计算）
         """
         market_value = self.position * close_price
         total_equity = self.cash + market_value
-        self.equity_curve.append({
-            'datetime': datetime,
-            'cash': round(self.cash, 2),
-            'market_value': round(market_value, 2),
-            'total_equity': round(total_equity, 2),
-            'position': self.position,
-        })
+        i = self._eq_i
+        if i == len(self._eq_cash):
+            self._grow()
+        self._eq_ts[i] = datetime
+        self._eq_cash[i] = self.cash
+        self._eq_mv[i] = market_value
+        self._eq_total[i] = total_equity
+        self._eq_pos[i] = self.position
+        self._eq_i = i + 1
+        self._equity_df = None
+
+    def build_equity_curve(self, timestamps: np.ndarray, close: np.ndarray) -> None:
+        """
+        回测结束后一次性计算权益曲线，代替逐根K线调用 update_market_value。
+        资金和持仓是只在成交时变化的阶梯函数: 每根K线取不晚于它的最后一次变动，
+        总资产 = 现金 + 持仓 * 收盘价，整条曲线一次 NumPy 运算完成。
+        """
+        n = len(close)
+        cash = np.full(n, float(self.initial_capital))
+        position = np.zeros(n, dtype=np.int64)
+        if self._changes:
+            change_idx, change_cash, change_pos = (np.array(col) for col in zip(*self._changes))
+            # 同一根K线多次成交时取最后一次
+            k = np.searchsorted(change_idx, np.arange(n), side='right') - 1
+            has_change = k >= 0
+            cash[has_change] = change_cash[k[has_change]]
+            position[has_change] = change_pos[k[has_change]]
+        self._store_equity(timestamps, cash, position, close)
+
+    def _store_equity(
+        self,
+        timestamps: np.ndarray,
+        cash: np.ndarray,
+        position: np.ndarray,
+        close: np.ndarray
+    ) -> None:
+        """以整列数组写入权益曲线"""
+        market_value = position * close
+        self._eq_ts = np.asarray(timestamps, dtype='datetime64[ns]')
+        self._eq_cash = np.asarray(cash, dtype=np.float64)
+        self._eq_mv = market_value
+        self._eq_total = cash + market_value
+        self._eq_pos = np.asarray(position, dtype=np.int64)
+        self._eq_i = len(close)
+        self._equity_df = None
 
     def get_equity_df(self) -> pd.DataFrame:
-        """将权益曲线转换为 DataFrame"""
-        if not self.equity_curve:
+        """
+        将权益曲线转换为 DataFrame。
+        回测过程中金额不做取整，只在这里统一保留 2 位小数（一次向量化运算）。
+        """
+        if self._equity_df is not None:
+            return self._equity_df
+        n = self._eq_i
+        if n == 0:
             return pd.DataFrame()
-        return pd.DataFrame(self.equity_curve).set_index('datetime')
+        df = pd.DataFrame(
+            {
+                'cash': self._eq_cash[:n],
+                'market_value': self._eq_mv[:n],
+                'total_equity': self._eq_total[:n],
+                'position': self._eq_pos[:n],
+            },
+            index=pd.DatetimeIndex(self._eq_ts[:n], name='datetime')
+        )
+        self._equity_df = df.round({'cash': 2, 'market_value': 2, 'total_equity': 2})
+        return self._equity_df
 
     def get_trades_df(self) -> pd.DataFrame:
-        """将交易记录转换为 DataFrame"""
-        if not self.trades:
+        """将交易记录转换为 DataFrame（成交价保留 4 位、手续费保留 2 位小数）"""
+        n = self._n_trades
+        if self._trades_df_len == n:
+            return self._trades_df
+        if n == 0:
             return pd.DataFrame(
                 columns=['datetime', 'symbol', 'direction', 'price',
                          'quantity', 'commission', 'slippage']
             )
-        return pd.DataFrame([
-            {
-                'datetime': t.datetime,
-                'symbol': t.symbol,
-                'direction': t.direction,
-                'price': t.price,
-                'quantity': t.quantity,
-                'commission': t.commission,
-                'slippage': t.slippage,
-            }
-            for t in self.trades
-        ])
+        # 直接按列切片成交数组，不逐笔遍历
+        buf = self._tr_buf[:n]
+        names = np.array([d.name for d in OrderDirection])
+        df = pd.DataFrame({
+            'datetime': self._tr_ts[:n],
+            'symbol': self._tr_syms[:n],
+            'direction': names[buf[:, 0].astype(np.int64)],
+            'price': buf[:, 1],
+            'quantity': buf[:, 2].astype(np.int64),
+            'commission': buf[:, 3],
+            'slippage': buf[:, 4],
+        })
+        self._trades_df = df.round({'price': 4, 'commission': 2})
+        self._trades_df_len = n
+        return self._trades_df
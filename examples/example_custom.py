@@ -39,25 +39,25 @@ class MyStrategy(Strategy):
     def init(self):
         """初始化: 预计算所有需要的技术指标"""
         data = self.ctx.data
-        self.sma5 = sma(data['close'], 5)    # 5日均线
-        self.sma20 = sma(data['close'], 20)  # 20日均线
-        self.rsi14 = rsi(data['close'], 14)  # 14日RSI
+        # 转成 ndarray 保存，on_bar 中按下标读取比 Series.iloc 快得多
+        self.sma5 = sma(data['close'], 5).to_numpy()    # 5日均线
+        self.sma20 = sma(data['close'], 20).to_numpy()  # 20日均线
+        self.rsi14 = rsi(data['close'], 14).to_numpy()  # 14日RSI
 
-    def on_bar(self, bar):
+    def on_bar(self, bar, idx):
         """
         每根K线的交易逻辑:
         1. 等待指标数据充分（至少20天）
         2. 判断均线关系和RSI位置
         3. 满足条件时发出买卖信号
         """
-        idx = self.ctx.current_idx
         if idx < 20:  # 等待指标计算充分
             return
 
         # 获取当前指标值
-        s5 = self.sma5.iloc[idx]
-        s20 = self.sma20.iloc[idx]
-        r = self.rsi14.iloc[idx]
+        s5 = self.sma5[idx]
+        s20 = self.sma20[idx]
+        r = self.rsi14[idx]
 
         # 买入条件: 均线多头排列 + RSI 低位
         if s5 > s20 and r < 40 and self.position == 0:
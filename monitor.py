@@ -18,11 +18,14 @@
 
 import sys
 import os
+import math
 import time
 import argparse
 import winsound
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 
 import pandas as pd
 import numpy as np
@@ -30,8 +33,6 @@ import numpy as np
 # 添加项目路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from quant_backtest.strategy.indicators import sma, rsi, bollinger_bands
-
 
 # ============================================================
 #  配置
@@ -48,12 +49,21 @@ SOUND_BUY  = (1000, 500)   # 买入信号: 高音
 SOUND_SELL = (500, 500)    # 卖出信号: 低音
 SOUND_ALERT = (800, 200)   # 普通提醒
 
+# 提示音在后台单线程中播放: Beep 会阻塞约 1 秒，不能卡住监控主循环；
+# 单线程保证多个信号的提示音依次播放、不会重叠
+_beep_executor = ThreadPoolExecutor(max_workers=1)
+
+# 距下一轮扫描不足该秒数时，在后台提前获取行情，到点时数据通常已就绪
+PREFETCH_LEAD = 30
+
 
 # ============================================================
 #  数据获取
 # ============================================================
 
-def fetch_latest_data(symbol: str, market: str, days: int = 120) -> Optional[pd.DataFrame]:
+def fetch_latest_data(
+    symbol: str, market: str, days: int = 120, min_bars: int = 30
+) -> Optional[pd.DataFrame]:
     """
     获取最近 N 天的日K线数据（用于指标计算）。
 
@@ -61,6 +71,7 @@ def fetch_latest_data(symbol: str, market: str, days: int = 120) -> Optional[pd.
         symbol: 股票代码
         market: "A" 或 "US"
         days: 获取最近多少天的数据
+        min_bars: 至少需要的K线数量（增量刷新时只需最近几根）
     """
     end_date = datetime.now().strftime("%Y-%m-%d")
     start_date = (datetime.now() - timedelta(days=days * 2)).strftime("%Y-%m-%d")
@@ -100,7 +111,7 @@ def fetch_latest_data(symbol: str, market: str, days: int = 120) -> Optional[pd.
         # 只保留最近 days 根K线
         df = df.tail(days)
 
-        if len(df) < 30:
+        if len(df) < min_bars:
             print(f"  [警告] {symbol} 数据不足 ({len(df)} 根K线)")
             return None
 
@@ -111,6 +122,181 @@ def fetch_latest_data(symbol: str, market: str, days: int = 120) -> Optional[pd.
         return None
 
 
+# ============================================================
+#  增量指标
+# ============================================================
+
+class _RollingWindow:
+    """
+    滑动窗口累加器，增量计算 rolling mean / std。
+    只保存已收盘K线的最近 period-1 个值及其和、平方和，
+    加上当前（未收盘）K线的值即构成完整窗口。
+    """
+
+    __slots__ = ('period', 'values', 'total', 'total_sq')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values: deque = deque(maxlen=period - 1)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, x: float) -> None:
+        """提交一个已收盘K线的值"""
+        if len(self.values) == self.values.maxlen:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+
+    def ready(self) -> bool:
+        return len(self.values) == self.period - 1
+
+    def mean(self, x: float) -> float:
+        """以 x 为窗口最新值时的均值，数据不足时返回 NaN"""
+        if not self.ready():
+            return math.nan
+        return (self.total + x) / self.period
+
+    def std(self, x: float) -> float:
+        """以 x 为窗口最新值时的样本标准差 (ddof=1，与 rolling().std() 一致)"""
+        if not self.ready():
+            return math.nan
+        n = self.period
+        s = self.total + x
+        var = (self.total_sq + x * x - s * s / n) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class _SymbolState:
+    """单只股票的增量指标状态"""
+
+    __slots__ = ('last_ts', 'close', 'prev_close', 'sma5_prev', 'sma20_prev',
+                 'win5', 'win20', 'gains', 'losses', 'snapshot')
+
+    def __init__(self):
+        self.last_ts = None            # 最新K线日期（当天K线盘中会不断更新）
+        self.close = math.nan          # 最新K线收盘价
+        self.prev_close = math.nan     # 上一根已收盘K线的收盘价
+        self.sma5_prev = math.nan
+        self.sma20_prev = math.nan
+        self.win5 = _RollingWindow(5)
+        self.win20 = _RollingWindow(20)   # SMA20 与布林带共用
+        self.gains = _RollingWindow(14)
+        self.losses = _RollingWindow(14)
+        self.snapshot: Optional[Dict[str, float]] = None   # values() 的缓存，喂入新数据后失效
+
+    def commit(self) -> None:
+        """最新K线收盘，并入滑动窗口"""
+        x = self.close
+        self.sma5_prev = self.win5.mean(x)
+        self.sma20_prev = self.win20.mean(x)
+        if not math.isnan(self.prev_close):
+            delta = x - self.prev_close
+            self.gains.push(delta if delta > 0 else 0.0)
+            self.losses.push(-delta if delta < 0 else 0.0)
+        self.win5.push(x)
+        self.win20.push(x)
+        self.prev_close = x
+
+
+class IncrementalIndicators:
+    """
+    监控用的增量指标（按股票代码保存状态）。
+
+    首次出现的股票用完整历史初始化，之后每次只需喂入最近几根K线:
+    同一日期的K线（盘中刷新）只替换最新值，新日期的K线先把上一根并入窗口。
+    每次更新只做常数次标量运算，与历史长度无关。
+    指标口径与 strategy.indicators 一致: SMA(5/20)、RSI(14，简单移动平均)、布林带(20, 2)。
+    """
+
+    def __init__(self):
+        self._states: Dict[str, _SymbolState] = {}
+
+    def has(self, symbol: str) -> bool:
+        return symbol in self._states
+
+    def reset(self, symbol: str) -> None:
+        self._states.pop(symbol, None)
+
+    def feed(self, symbol: str, df: pd.DataFrame) -> bool:
+        """
+        喂入K线数据（按日期升序）。
+        已有状态而数据与之衔接不上（最早一根晚于已记录的最新K线，中间可能缺K线），
+        或重叠部分的历史收盘价与窗口中保存的不一致时返回 False，
+        调用方应 reset 后用完整历史重新初始化。
+        """
+        state = self._states.get(symbol)
+        if state is None:
+            state = self._states[symbol] = _SymbolState()
+        elif len(df) and (df.index[0] > state.last_ts or not self._history_matches(state, df)):
+            return False
+
+        state.snapshot = None
+        for ts, close in zip(df.index, df['close'].tolist()):
+            if state.last_ts is None or ts > state.last_ts:
+                if state.last_ts is not None:
+                    state.commit()
+                state.last_ts = ts
+                state.close = close
+            elif ts == state.last_ts:
+                state.close = close
+        return True
+
+    @staticmethod
+    def _history_matches(state: _SymbolState, df: pd.DataFrame) -> bool:
+        """
+        df 中早于 state.last_ts 的收盘价是否与窗口里已收盘的值一致。
+        前复权数据每次除权除息后都会改写全部历史价格，窗口里留着旧口径的价格
+        会让均线、布林带、RSI 新旧混算，必须用完整历史重建。
+        """
+        old = df['close'].to_numpy(dtype=float)[:df.index.searchsorted(state.last_ts)]
+        stored = state.win20.values   # 最近 19 根已收盘K线，最后一个即 prev_close
+        n = min(len(old), len(stored))
+        if n == 0:
+            return True
+        return bool(np.allclose(old[-n:], np.array(stored)[-n:], rtol=1e-6, atol=0.0))
+
+    def values(self, symbol: str) -> Dict[str, float]:
+        """
+        当前各指标的标量值（数据不足的指标为 NaN）。
+        结果缓存到下一次 feed，状态打印和信号检测共用同一份，不重复计算。
+        """
+        st = self._states[symbol]
+        if st.snapshot is not None:
+            return st.snapshot
+        close = st.close
+
+        sma5 = st.win5.mean(close)
+        sma20 = st.win20.mean(close)
+        std20 = st.win20.std(close)
+
+        rsi_val = math.nan
+        if not math.isnan(st.prev_close):
+            delta = close - st.prev_close
+            avg_gain = st.gains.mean(delta if delta > 0 else 0.0)
+            avg_loss = st.losses.mean(-delta if delta < 0 else 0.0)
+            if avg_loss > 0:
+                rsi_val = 100 - 100 / (1 + avg_gain / avg_loss)
+            elif avg_gain > 0:
+                rsi_val = 100.0
+
+        st.snapshot = {
+            'close': close,
+            'prev_close': st.prev_close,
+            'sma5': sma5,
+            'sma20': sma20,
+            'sma5_prev': st.sma5_prev,
+            'sma20_prev': st.sma20_prev,
+            'rsi': rsi_val,
+            'upper': sma20 + 2.0 * std20,
+            'lower': sma20 - 2.0 * std20,
+        }
+        return st.snapshot
+
+
 # ============================================================
 #  信号检测
 # ============================================================
@@ -125,45 +311,41 @@ class SignalDetector:
         # 记录上一次的状态，避免重复报警
         self._last_signals: Dict[str, Dict[str, str]] = {}
 
-    def detect(self, symbol: str, df: pd.DataFrame) -> List[Dict]:
+    def detect(self, symbol: str, values: Dict[str, float]) -> List[Dict]:
         """
         检测所有策略的信号。
 
+        参数:
+            values: IncrementalIndicators.values() 返回的指标标量
+
         返回:
             信号列表 [{"strategy": "SMA交叉", "direction": "BUY", "reason": "..."}, ...]
         """
         signals = []
 
         # 1. SMA 均线交叉
-        sig = self._check_sma(symbol, df)
+        sig = self._check_sma(symbol, values)
         if sig:
             signals.append(sig)
 
         # 2. RSI 超买超卖
-        sig = self._check_rsi(symbol, df)
+        sig = self._check_rsi(symbol, values)
         if sig:
             signals.append(sig)
 
         # 3. 布林带突破
-        sig = self._check_bollinger(symbol, df)
+        sig = self._check_bollinger(symbol, values)
         if sig:
             signals.append(sig)
 
         return signals
 
-    def _check_sma(self, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
-        """检测 SMA 金叉/死叉"""
-        close = df['close']
-        sma5 = sma(close, 5)
-        sma20 = sma(close, 20)
-
-        if len(df) < 21:
-            return None
-
-        short_now = sma5.iloc[-1]
-        long_now = sma20.iloc[-1]
-        short_prev = sma5.iloc[-2]
-        long_prev = sma20.iloc[-2]
+    def _check_sma(self, symbol: str, values: Dict[str, float]) -> Optional[Dict]:
+        """检测 SMA 金叉/死叉（数据不足时均线为 NaN，比较结果为 False）"""
+        short_now = values['sma5']
+        long_now = values['sma20']
+        short_prev = values['sma5_prev']
+        long_prev = values['sma20_prev']
 
         key = f"{symbol}_SMA"
 
@@ -174,7 +356,7 @@ class SignalDetector:
                     "strategy": "SMA交叉(5/20)",
                     "direction": "BUY",
                     "reason": f"5日均线({short_now:.2f})上穿20日均线({long_now:.2f})",
-                    "price": close.iloc[-1],
+                    "price": values['close'],
                 }
 
         # 死叉
@@ -184,20 +366,17 @@ class SignalDetector:
                     "strategy": "SMA交叉(5/20)",
                     "direction": "SELL",
                     "reason": f"5日均线({short_now:.2f})下穿20日均线({long_now:.2f})",
-                    "price": close.iloc[-1],
+                    "price": values['close'],
                 }
 
         return None
 
-    def _check_rsi(self, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
+    def _check_rsi(self, symbol: str, values: Dict[str, float]) -> Optional[Dict]:
         """检测 RSI 超买超卖"""
-        close = df['close']
-        rsi_series = rsi(close, 14)
-
-        if len(df) < 15:
+        current_rsi = values['rsi']
+        if math.isnan(current_rsi):
             return None
 
-        current_rsi = rsi_series.iloc[-1]
         key = f"{symbol}_RSI"
 
         if current_rsi < 30:
@@ -206,7 +385,7 @@ class SignalDetector:
                     "strategy": "RSI(14)",
                     "direction": "BUY",
                     "reason": f"RSI={current_rsi:.1f} < 30 (超卖区间)",
-                    "price": close.iloc[-1],
+                    "price": values['close'],
                 }
         elif current_rsi > 70:
             if self._is_new_signal(key, "SELL"):
@@ -214,7 +393,7 @@ class SignalDetector:
                     "strategy": "RSI(14)",
                     "direction": "SELL",
                     "reason": f"RSI={current_rsi:.1f} > 70 (超买区间)",
-                    "price": close.iloc[-1],
+                    "price": values['close'],
                 }
         else:
             # RSI 回到中间区域，重置信号状态
@@ -222,17 +401,14 @@ class SignalDetector:
 
         return None
 
-    def _check_bollinger(self, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
+    def _check_bollinger(self, symbol: str, values: Dict[str, float]) -> Optional[Dict]:
         """检测布林带突破"""
-        close = df['close']
-        upper, middle, lower = bollinger_bands(close, 20, 2.0)
-
-        if len(df) < 21:
+        current_upper = values['upper']
+        current_lower = values['lower']
+        if math.isnan(current_upper):
             return None
 
-        current_close = close.iloc[-1]
-        current_upper = upper.iloc[-1]
-        current_lower = lower.iloc[-1]
+        current_close = values['close']
         key = f"{symbol}_BOLL"
 
         if current_close <= current_lower:
@@ -289,7 +465,12 @@ def alert_signal(stock: Dict, signal: Dict):
     print("=" * 60)
     print()
 
-    # 声音提醒
+    # 声音提醒（后台播放，立即返回）
+    _beep_executor.submit(_beep_sequence, direction)
+
+
+def _beep_sequence(direction: str):
+    """播放信号提示音（阻塞，在 _beep_executor 中执行）"""
     try:
         if direction == "BUY":
             # 买入信号: 连续两声高音
@@ -305,16 +486,16 @@ def alert_signal(stock: Dict, signal: Dict):
         pass  # 非 Windows 系统跳过声音
 
 
-def print_status(stock: Dict, df: pd.DataFrame):
+def print_status(stock: Dict, values: Dict[str, float]):
     """打印当前行情摘要"""
-    close = df['close'].iloc[-1]
-    prev_close = df['close'].iloc[-2]
+    close = values['close']
+    prev_close = values['prev_close']
     change = (close - prev_close) / prev_close * 100
     change_str = f"+{change:.2f}%" if change >= 0 else f"{change:.2f}%"
 
-    rsi_val = rsi(df['close'], 14).iloc[-1]
-    sma5_val = sma(df['close'], 5).iloc[-1]
-    sma20_val = sma(df['close'], 20).iloc[-1]
+    rsi_val = values['rsi']
+    sma5_val = values['sma5']
+    sma20_val = values['sma20']
 
     print(f"  {stock['name']:>8}({stock['symbol']:<8}) "
           f"价格:{close:>10.2f} ({change_str:>8}) "
@@ -326,6 +507,58 @@ def print_status(stock: Dict, df: pd.DataFrame):
 #  主循环
 # ============================================================
 
+def refresh_indicators(indicators: IncrementalIndicators, stock: Dict) -> bool:
+    """
+    拉取行情并更新增量指标。
+    首次监控的股票拉取完整历史初始化；之后只拉最近几根K线，
+    衔接不上（如长时间获取失败）或历史价格被改写（前复权数据除权除息）时重新初始化。
+    """
+    symbol, market = stock['symbol'], stock['market']
+    if indicators.has(symbol):
+        df = fetch_latest_data(symbol, market, days=10, min_bars=1)
+        if df is None:
+            return False
+        if indicators.feed(symbol, df):
+            return True
+        indicators.reset(symbol)
+
+    df = fetch_latest_data(symbol, market)
+    if df is None:
+        return False
+    indicators.feed(symbol, df)
+    return True
+
+
+def refresh_all(indicators: IncrementalIndicators, stocks: List[Dict]) -> List[bool]:
+    """
+    并发刷新所有股票（行情获取是网络 I/O，多线程并发时整轮耗时约等于最慢的一次请求）。
+    每只股票只更新自己的指标状态，线程之间不共享数据。
+    返回与 stocks 顺序一致的刷新结果。
+    """
+    if not stocks:
+        return []
+    with ThreadPoolExecutor(max_workers=min(16, len(stocks))) as ex:
+        return list(ex.map(lambda stock: refresh_indicators(indicators, stock), stocks))
+
+
+def idle_wait(interval: int, start_prefetch: Callable[[], Future]) -> Future:
+    """
+    等待 interval 秒到下一轮扫描。
+    按 1 秒分段睡眠（Ctrl+C 最多 1 秒内响应）；剩余不足 PREFETCH_LEAD 秒时
+    调用 start_prefetch() 在后台开始下一轮的行情获取，返回其 Future，
+    主循环到点后直接取结果，不必再等待网络请求。
+    """
+    deadline = time.monotonic() + interval
+    pending = None
+    while True:
+        remaining = deadline - time.monotonic()
+        if pending is None and remaining <= PREFETCH_LEAD:
+            pending = start_prefetch()
+        if remaining <= 0:
+            return pending
+        time.sleep(min(1.0, remaining))
+
+
 def run_monitor(stocks: List[Dict], interval: int = 1800):
     """
     主监控循环。
@@ -335,6 +568,7 @@ def run_monitor(stocks: List[Dict], interval: int = 1800):
         interval: 刷新间隔（秒），默认 1800（30分钟）
     """
     detector = SignalDetector()
+    indicators = IncrementalIndicators()
 
     print()
     print("=" * 60)
@@ -353,31 +587,44 @@ def run_monitor(stocks: List[Dict], interval: int = 1800):
     except Exception:
         pass
 
+    # 空闲等待期间提前获取下一轮行情的后台线程
+    prefetch_executor = ThreadPoolExecutor(max_workers=1)
+    pending = None
+
     cycle = 0
     while True:
         cycle += 1
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"\n--- 第 {cycle} 次扫描 | {now} ---")
 
-        for stock in stocks:
-            # 获取数据
-            df = fetch_latest_data(stock['symbol'], stock['market'])
-            if df is None:
+        # 并发获取数据并增量更新指标（等待期间已提前开始的直接取结果）
+        if pending is not None:
+            refreshed = pending.result()
+        else:
+            refreshed = refresh_all(indicators, stocks)
+
+        for stock, ok in zip(stocks, refreshed):
+            if not ok:
                 continue
+            values = indicators.values(stock['symbol'])
 
             # 打印当前行情
-            print_status(stock, df)
+            print_status(stock, values)
 
             # 检测信号
-            signals = detector.detect(stock['symbol'], df)
+            signals = detector.detect(stock['symbol'], values)
             for sig in signals:
                 alert_signal(stock, sig)
 
         # 等待下一次扫描
         print(f"\n下次扫描: {interval} 秒后...")
         try:
-            time.sleep(interval)
+            pending = idle_wait(
+                interval,
+                lambda: prefetch_executor.submit(refresh_all, indicators, stocks),
+            )
         except KeyboardInterrupt:
+            prefetch_executor.shutdown(wait=False, cancel_futures=True)
             print("\n\n监控已停止。")
             break
 
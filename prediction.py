@@ -10,20 +10,102 @@
 """
 
 import numpy as np
-import pandas as pd
-from quant_backtest.strategy.indicators import sma, ema, rsi, bollinger_bands, macd
+from numpy.lib.stride_tricks import sliding_window_view
+from quant_backtest._jit import HAS_NUMBA
+from quant_backtest.strategy.indicators import sma, rsi, bollinger_bands, macd
+from quant_backtest.strategy.indicators_fast import sma_nb, rsi_nb, bbands_nb, macd_nb
+
+
+def _precompute_indicators(df):
+    """
+    一次性计算评分和机器学习特征共用的指标，返回 {名称: ndarray}。
+    full_prediction 中只算一遍，分别传给 score_indicators 和 ml_predict。
+    使用 indicators_fast 的编译版本，直接在收盘价数组上计算；
+    未安装 numba 时这些内核只能逐元素解释执行，改用 strategy.indicators 的 pandas 实现。
+    """
+    if not HAS_NUMBA:
+        series = df['close'].astype(np.float64)
+        upper, middle, lower = bollinger_bands(series, 20, 2.0)
+        macd_line, signal_line, hist = macd(series, 12, 26, 9)
+        return {
+            'sma5': sma(series, 5).to_numpy(),
+            'sma20': middle.to_numpy(),     # 布林带中轨即 20 日均线
+            'sma60': sma(series, 60).to_numpy(),
+            'rsi14': rsi(series, 14).to_numpy(),
+            'bb_upper': upper.to_numpy(),
+            'bb_middle': middle.to_numpy(),
+            'bb_lower': lower.to_numpy(),
+            'macd_line': macd_line.to_numpy(),
+            'macd_signal': signal_line.to_numpy(),
+            'macd_hist': hist.to_numpy(),
+        }
+    close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+    upper, middle, lower = bbands_nb(close, 20, 2.0)
+    macd_line, signal_line, hist = macd_nb(close, 12, 26, 9)
+    return {
+        'sma5': sma_nb(close, 5),
+        'sma20': sma_nb(close, 20),
+        'sma60': sma_nb(close, 60),
+        'rsi14': rsi_nb(close, 14),
+        'bb_upper': upper,
+        'bb_middle': middle,
+        'bb_lower': lower,
+        'macd_line': macd_line,
+        'macd_signal': signal_line,
+        'macd_hist': hist,
+    }
 
 
 # ============================================================
 #  1. 机器学习预测 (随机森林)
 # ============================================================
 
-def ml_predict(df, forecast_days=3):
+# 已训练模型缓存: (symbol, forecast_days) -> (训练数据最后一根K线的索引, model, accuracy)
+# 数据每次只新增少量K线，新增不足 _RETRAIN_EVERY 根时复用模型，只对最新特征做预测
+_MODEL_CACHE = {}
+_RETRAIN_EVERY = 20
+
+# 特征表缓存: symbol -> (最后一根K线的索引, 特征矩阵, 收盘价数组)
+# 新数据只比上次多几根K线时，只为尾部重算收益率/波动率/成交量特征（窗口最长 11，
+# 多取一些K线作预热）；指标列每次都取自本次数据的 precomputed
+_FEATURE_CACHE = {}
+_FEATURE_WARMUP = 30
+
+# 特征矩阵的列顺序
+FEATURE_NAMES = ('ret_1d', 'ret_3d', 'ret_5d', 'rsi_14', 'sma5_dev',
+                 'sma20_dev', 'volatility', 'vol_change', 'bb_position', 'macd_hist')
+
+
+def _has_volume(df):
+    """
+    是否有有效成交量（任一K线成交量 > 0）。
+    优先读取获取数据时记录的 df.attrs['has_volume']，没有时才扫描一遍成交量列。
+    """
+    flag = df.attrs.get('has_volume')
+    if flag is None:
+        flag = 'volume' in df.columns and bool((df['volume'].to_numpy() > 0).any())
+    return flag
+
+
+def _bars_since(df, label):
+    """label 之后新增的K线数；label 不在 df 中（数据已更换）时返回 None"""
+    try:
+        pos = df.index.get_loc(label)
+    except KeyError:
+        return None
+    if not isinstance(pos, (int, np.integer)):
+        return None
+    return len(df) - 1 - pos
+
+
+def ml_predict(df, forecast_days=3, precomputed=None, symbol=""):
     """
     使用随机森林预测未来涨跌概率。
 
     特征: 过去N天的收益率、RSI、SMA偏离度、波动率、成交量变化
     标签: 未来 forecast_days 天的涨跌 (1=涨, 0=跌)
+    precomputed: _precompute_indicators 的结果，不传则内部计算
+    symbol: 传入时按标的缓存模型，新增K线不足 _RETRAIN_EVERY 根时不重新训练
 
     返回:
         {
@@ -39,53 +121,62 @@ def ml_predict(df, forecast_days=3):
     except ImportError:
         return {"error": "需要安装 scikit-learn: pip install scikit-learn"}
 
-    close = df['close'].values.astype(float)
+    close = df['close'].to_numpy(dtype=float)
 
     if len(close) < 60:
         return {"error": "数据不足，至少需要60根K线"}
 
     # ---- 构造特征 ----
-    features = _build_features(df)
+    features = _cached_features(df, precomputed, symbol)
     if features is None:
         return {"error": "特征构造失败"}
 
-    feature_df = features.dropna()
-    if len(feature_df) < 40:
+    # 去掉含 NaN 的行（指标预热期）
+    valid = ~np.isnan(features).any(axis=1)
+    feature_rows = features[valid]
+    if len(feature_rows) < 40:
         return {"error": "有效数据不足"}
 
     # ---- 构造标签: 未来N天涨跌 ----
-    future_return = df['close'].pct_change(forecast_days).shift(-forecast_days)
-    labels = (future_return > 0).astype(int)
-
-    # 合并特征和标签，去掉NaN
-    combined = feature_df.copy()
-    combined['label'] = labels
-    combined = combined.dropna()
-
-    if len(combined) < 30:
-        return {"error": "训练数据不足"}
+    # 最后 forecast_days 行没有未来数据，与比较 NaN 的结果一样记为 0
+    labels = np.zeros(len(close), dtype=np.int8)
+    if 0 < forecast_days < len(close):
+        future_return = close[forecast_days:] / close[:-forecast_days] - 1
+        labels[:-forecast_days] = future_return > 0
+    y_all = labels[valid]
+
+    cache_key = (symbol, forecast_days)
+    cached = _MODEL_CACHE.get(cache_key) if symbol else None
+    new_bars = _bars_since(df, cached[0]) if cached is not None else None
+
+    if new_bars is not None and new_bars < _RETRAIN_EVERY:
+        _, model, accuracy = cached
+    else:
+        # 决策树内部按 float32 连续数组计算，这里一次转换好，避免 sklearn 重复校验复制
+        X = np.ascontiguousarray(feature_rows, dtype=np.float32)
+        y = y_all
 
-    X = combined.drop(columns=['label']).values
-    y = combined['label'].values
+        # 用前80%训练，后20%测试
+        split = int(len(X) * 0.8)
+        X_train, X_test = X[:split], X[split:]
+        y_train, y_test = y[:split], y[split:]
 
-    # 用前80%训练，后20%测试
-    split = int(len(X) * 0.8)
-    X_train, X_test = X[:split], X[split:]
-    y_train, y_test = y[:split], y[split:]
+        # 训练随机森林（数据量只有一两百行，单进程比 joblib 多进程调度更快）
+        model = RandomForestClassifier(
+            n_estimators=50, max_depth=5,
+            random_state=42, n_jobs=1
+        )
+        model.fit(X_train, y_train)
 
-    # 训练随机森林
-    model = RandomForestClassifier(
-        n_estimators=100, max_depth=5,
-        random_state=42, n_jobs=-1
-    )
-    model.fit(X_train, y_train)
+        # 测试集准确率
+        accuracy = model.score(X_test, y_test) if len(X_test) > 0 else 0
 
-    # 测试集准确率
-    accuracy = model.score(X_test, y_test) if len(X_test) > 0 else 0
+        if symbol:
+            _MODEL_CACHE[cache_key] = (df.index[-1], model, accuracy)
 
     # 预测当前（最新一行特征）
-    latest_features = feature_df.iloc[-1:].values
-    prob = model.predict_proba(latest_features)[0]
+    latest_features = np.ascontiguousarray(feature_rows[-1:], dtype=np.float32)
+    prob = _forest_proba(model, latest_features)[0]
 
     # 确保 prob 有两个值 (class 0 和 class 1)
     if len(model.classes_) == 2:
@@ -107,9 +198,7 @@ def ml_predict(df, forecast_days=3):
     direction = "看涨" if up_prob > 0.5 else "看跌"
 
     # 特征重要性
-    feat_names = ['ret_1d', 'ret_3d', 'ret_5d', 'rsi_14', 'sma5_dev',
-                  'sma20_dev', 'volatility', 'vol_change', 'bb_position', 'macd_hist']
-    importances = dict(zip(feat_names, model.feature_importances_.tolist()))
+    importances = dict(zip(FEATURE_NAMES, model.feature_importances_.tolist()))
 
     return {
         "up_prob": round(up_prob, 3),
@@ -118,63 +207,160 @@ def ml_predict(df, forecast_days=3):
         "confidence": confidence,
         "accuracy": round(accuracy, 3),
         "forecast_days": forecast_days,
-        "features": {k: round(float(feature_df[k].iloc[-1]), 4) for k in feature_df.columns},
+        "features": {k: round(float(v), 4) for k, v in zip(FEATURE_NAMES, feature_rows[-1])},
         "importances": importances,
     }
 
 
-def _build_features(df):
-    """构造机器学习特征"""
-    close = df['close']
-    try:
-        feat = pd.DataFrame(index=df.index)
+def _forest_proba(model, X):
+    """
+    随机森林预测概率: 逐棵树预测后取平均，与 model.predict_proba 相同。
+    X 已是 float32 连续数组，跳过每棵树的输入校验（单行预测时校验开销大于计算本身）。
+    """
+    proba = model.estimators_[0].predict_proba(X, check_input=False)
+    for est in model.estimators_[1:]:
+        proba += est.predict_proba(X, check_input=False)
+    return proba / len(model.estimators_)
 
-        # 收益率
-        feat['ret_1d'] = close.pct_change(1)
-        feat['ret_3d'] = close.pct_change(3)
-        feat['ret_5d'] = close.pct_change(5)
 
-        # RSI
-        feat['rsi_14'] = rsi(close, 14) / 100.0
+def _cached_features(df, precomputed, symbol):
+    """
+    按标的缓存特征表，结果与 _build_features 对当前 df 整表重算完全一致。
+
+    只有收益率、波动率、成交量变化这几列沿用缓存的行，并且只为上次之后的K线重算
+    （上次的最后一根K线可能是盘中未完成的数据，也一并重算）:
+        - 开头 _FEATURE_WARMUP 行在旧数据里有更早的K线可用，整表重算时却是预热期，重算
+        - RSI / 均线 / 布林带 / MACD 列取自本次整段数据的 precomputed，每次整列重填
+          （EMA 类指标与数据起点有关，不能沿用旧窗口算出的值）
+        - 重叠部分的收盘价与缓存时不同（如前复权数据除权除息后）时整表重算
+    """
+    if precomputed is None:
+        precomputed = _precompute_indicators(df)
+    # 成交量标记取自整段数据，尾部重算与整表重算一致
+    has_volume = _has_volume(df)
+    close = df['close'].to_numpy(dtype=float)
+    cached = _FEATURE_CACHE.get(symbol) if symbol else None
+    new_bars = _bars_since(df, cached[0]) if cached is not None else None
+
+    if new_bars is not None:
+        start = len(df) - 1 - new_bars          # 上次最后一根K线的位置
+        offset = len(cached[1]) - 1 - start     # 新数据第一根K线在缓存矩阵中的行号
+        if offset < 0 or not np.array_equal(cached[2][offset:offset + start], close[:start]):
+            new_bars = None                     # 比缓存覆盖的范围更早或历史价格已改写，整表重算
+
+    if new_bars is None:
+        features = _build_features(df, precomputed, has_volume)
+    else:
+        ctx = max(start - _FEATURE_WARMUP, 0)
+        tail = _build_features(
+            df.iloc[ctx:], {k: v[ctx:] for k, v in precomputed.items()}, has_volume
+        )
+        head_n = min(_FEATURE_WARMUP, start)
+        head = _build_features(
+            df.iloc[:head_n], {k: v[:head_n] for k, v in precomputed.items()}, has_volume
+        )
+        if tail is None or head is None:
+            return None
+        features = np.concatenate([cached[1][offset:-1], tail[start - ctx:]])
+        features[:head_n] = head
+        _fill_indicator_features(features, close, precomputed)
+
+    if symbol and features is not None:
+        _FEATURE_CACHE[symbol] = (df.index[-1], features, close)
+    return features
+
+
+def _pct_change(arr, periods):
+    """变化率（与 Series.pct_change 相同），前 periods 个位置为 NaN"""
+    out = np.full(len(arr), np.nan)
+    if len(arr) > periods:
+        out[periods:] = arr[periods:] / arr[:-periods] - 1
+    return out
+
+
+def _rolling_mean(arr, window):
+    """滚动均值（窗口视图一次计算），前 window-1 个位置为 NaN"""
+    out = np.full(len(arr), np.nan)
+    if len(arr) >= window:
+        out[window - 1:] = sliding_window_view(arr, window).mean(axis=1)
+    return out
+
+
+def _rolling_std(arr, window):
+    """滚动样本标准差 (ddof=1)，前 window-1 个位置为 NaN"""
+    out = np.full(len(arr), np.nan)
+    if len(arr) >= window:
+        out[window - 1:] = sliding_window_view(arr, window).std(axis=1, ddof=1)
+    return out
+
+
+def _build_features(df, precomputed=None, has_volume=None):
+    """
+    构造机器学习特征，返回 (K线数, len(FEATURE_NAMES)) 的 float64 矩阵。
+    行与 df 对齐，列顺序见 FEATURE_NAMES，指标预热期的行含 NaN。
+    has_volume 不传则由 _has_volume 判断。
+    """
+    close = df['close'].to_numpy(dtype=float)
+    try:
+        ind = precomputed if precomputed is not None else _precompute_indicators(df)
+        feat = np.empty((len(close), len(FEATURE_NAMES)))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 收益率 ret_1d / ret_3d / ret_5d
+            ret_1d = _pct_change(close, 1)
+            feat[:, 0] = ret_1d
+            feat[:, 1] = _pct_change(close, 3)
+            feat[:, 2] = _pct_change(close, 5)
+
+            # 波动率 volatility (10日)
+            feat[:, 6] = _rolling_std(ret_1d, 10)
+
+            # 成交量变化 vol_change
+            if has_volume is None:
+                has_volume = _has_volume(df)
+            if has_volume:
+                volume = df['volume'].to_numpy(dtype=float)
+                feat[:, 7] = (volume / _rolling_mean(volume, 10)) - 1
+            else:
+                feat[:, 7] = 0.0
 
-        # 均线偏离度
-        sma5 = sma(close, 5)
-        sma20 = sma(close, 20)
-        feat['sma5_dev'] = (close - sma5) / sma5
-        feat['sma20_dev'] = (close - sma20) / sma20
+            _fill_indicator_features(feat, close, ind)
 
-        # 波动率 (10日)
-        feat['volatility'] = close.pct_change().rolling(10).std()
+        return feat
+    except Exception:
+        return None
 
-        # 成交量变化
-        if 'volume' in df.columns and df['volume'].sum() > 0:
-            vol_ma = df['volume'].rolling(10).mean()
-            feat['vol_change'] = (df['volume'] / vol_ma) - 1
-        else:
-            feat['vol_change'] = 0.0
 
-        # 布林带位置 (0=下轨, 1=上轨)
-        upper, middle, lower = bollinger_bands(close, 20, 2.0)
-        feat['bb_position'] = (close - lower) / (upper - lower)
+def _fill_indicator_features(feat, close, ind):
+    """填入取自 precomputed 指标的特征列: rsi_14 / sma5_dev / sma20_dev / bb_position / macd_hist"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # RSI rsi_14
+        feat[:, 3] = ind['rsi14'] / 100.0
 
-        # MACD 柱状图
-        macd_line, signal_line, hist = macd(close)
-        feat['macd_hist'] = hist / close  # 归一化
+        # 均线偏离度 sma5_dev / sma20_dev
+        sma5 = ind['sma5']
+        sma20 = ind['sma20']
+        feat[:, 4] = (close - sma5) / sma5
+        feat[:, 5] = (close - sma20) / sma20
 
-        return feat
-    except Exception:
-        return None
+        # 布林带位置 bb_position (0=下轨, 1=上轨)
+        upper, lower = ind['bb_upper'], ind['bb_lower']
+        feat[:, 8] = (close - lower) / (upper - lower)
+
+        # MACD 柱状图 macd_hist（按收盘价归一化）
+        feat[:, 9] = ind['macd_hist'] / close
 
 
 # ============================================================
 #  2. 多指标综合评分
 # ============================================================
 
-def score_indicators(df):
+def score_indicators(df, precomputed=None):
     """
     综合打分系统: 将多个指标转换为 -100 到 +100 的分数。
 
     正分=看涨，负分=看跌，0附近=中性。
+    precomputed: _precompute_indicators 的结果，不传则内部计算
 
     返回:
         {
@@ -186,16 +372,30 @@ def score_indicators(df):
             ]
         }
     """
-    close = df['close']
+    close = df['close'].to_numpy(dtype=float)
+    volume = df['volume'].to_numpy(dtype=float) if _has_volume(df) else None
+    ind = precomputed if precomputed is not None else _precompute_indicators(df)
+    return _score_fast(close, volume, ind)
+
+
+def _score_fast(close, volume, ind):
+    """
+    score_indicators 的计算部分，只接收 ndarray:
+        close: 收盘价数组
+        volume: 成交量数组，无成交量数据时为 None
+        ind: _precompute_indicators 的结果
+    DataFrame 取列只在外层做一次，这里只读取各数组末尾几个值，不再经过 pandas。
+    """
+    n = len(close)
     details = []
     total = 0
 
     # ---- 1. SMA 趋势 (满分 ±20) ----
-    if len(df) >= 21:
-        sma5_val = float(sma(close, 5).iloc[-1])
-        sma20_val = float(sma(close, 20).iloc[-1])
-        sma60_val = float(sma(close, min(60, len(df))).iloc[-1]) if len(df) >= 60 else sma20_val
-        price = float(close.iloc[-1])
+    if n >= 21:
+        sma5_val = ind['sma5'][-1]
+        sma20_val = ind['sma20'][-1]
+        sma60_val = ind['sma60'][-1] if n >= 60 else sma20_val
+        price = close[-1]
 
         score = 0
         reasons = []
@@ -224,8 +424,8 @@ def score_indicators(df):
         total += score
 
     # ---- 2. RSI (满分 ±20) ----
-    if len(df) >= 15:
-        rsi_val = float(rsi(close, 14).iloc[-1])
+    if n >= 15:
+        rsi_val = ind['rsi14'][-1]
         if rsi_val < 30:
             score = 20
             reason = f"RSI={rsi_val:.1f} 超卖区间(强烈看涨)"
@@ -246,10 +446,9 @@ def score_indicators(df):
         total += score
 
     # ---- 3. 布林带位置 (满分 ±20) ----
-    if len(df) >= 21:
-        upper, middle, lower = bollinger_bands(close, 20, 2.0)
-        c = float(close.iloc[-1])
-        u, l, m = float(upper.iloc[-1]), float(lower.iloc[-1]), float(middle.iloc[-1])
+    if n >= 21:
+        c = close[-1]
+        u, l = ind['bb_upper'][-1], ind['bb_lower'][-1]
         band_width = u - l
         if band_width > 0:
             position = (c - l) / band_width  # 0~1
@@ -276,11 +475,11 @@ def score_indicators(df):
         total += score
 
     # ---- 4. MACD (满分 ±20) ----
-    if len(df) >= 35:
-        macd_line, signal_line, hist = macd(close)
-        h_now = float(hist.iloc[-1])
-        h_prev = float(hist.iloc[-2])
-        m_now = float(macd_line.iloc[-1])
+    if n >= 35:
+        hist = ind['macd_hist']
+        h_now = hist[-1]
+        h_prev = hist[-2]
+        m_now = ind['macd_line'][-1]
 
         score = 0
         reasons = []
@@ -309,11 +508,10 @@ def score_indicators(df):
         total += score
 
     # ---- 5. 成交量趋势 (满分 ±20) ----
-    if 'volume' in df.columns and len(df) >= 10 and df['volume'].sum() > 0:
-        vol_now = float(df['volume'].iloc[-1])
-        vol_ma5 = float(df['volume'].rolling(5).mean().iloc[-1])
-        vol_ma10 = float(df['volume'].rolling(10).mean().iloc[-1])
-        price_change = float(close.iloc[-1] - close.iloc[-2])
+    if n >= 10 and volume is not None:
+        vol_now = volume[-1]
+        vol_ma5 = volume[-5:].mean()
+        price_change = close[-1] - close[-2]
 
         score = 0
         reasons = []
@@ -387,49 +585,47 @@ def support_resistance(df, levels_count=3):
             "position": "接近阻力位",
         }
     """
-    high = df['high'].values.astype(float)
-    low = df['low'].values.astype(float)
-    close_arr = df['close'].values.astype(float)
-
-    current = float(close_arr[-1])
-    prev_high = float(high[-2])
-    prev_low = float(low[-2])
-    prev_close = float(close_arr[-2])
+    hlc = df[['high', 'low', 'close']].to_numpy(dtype=float)
 
-    # ---- 经典枢轴点 ----
-    pivot = (prev_high + prev_low + prev_close) / 3
-
-    # 三个支撑位
-    s1 = 2 * pivot - prev_high
-    s2 = pivot - (prev_high - prev_low)
-    s3 = prev_low - 2 * (prev_high - pivot)
-
-    # 三个阻力位
-    r1 = 2 * pivot - prev_low
-    r2 = pivot + (prev_high - prev_low)
-    r3 = prev_high + 2 * (pivot - prev_low)
+    current = hlc[-1, 2]
+    prev = hlc[-2]
+    prev_high, prev_low, prev_close = prev
 
     # ---- 历史关键价位 (近30天高低点) ----
     lookback = min(30, len(df))
-    recent_high = float(high[-lookback:].max())
-    recent_low = float(low[-lookback:].min())
-
-    # 合并并排序
-    all_supports = sorted(set([round(s, 2) for s in [s1, s2, s3, recent_low]]), reverse=True)
-    all_resistances = sorted(set([round(r, 2) for r in [r1, r2, r3, recent_high]]))
+    recent_high = hlc[-lookback:, 0].max()
+    recent_low = hlc[-lookback:, 1].min()
 
-    # 只保留在当前价格下方的支撑、上方的阻力
-    supports = [s for s in all_supports if s < current][:levels_count]
-    resistances = [r for r in all_resistances if r > current][:levels_count]
-
-    # 如果不够，用计算值补充
+    # ---- 经典枢轴点 ----
+    pivot = prev.mean()
+    hl = prev_high - prev_low
+
+    # 三个支撑位、三个阻力位和近期高低点放在一个数组里，一次取整
+    levels = np.round(np.array([
+        2 * pivot - prev_high,                  # S1
+        pivot - hl,                             # S2
+        prev_low - 2 * (prev_high - pivot),     # S3
+        2 * pivot - prev_low,                   # R1
+        pivot + hl,                             # R2
+        prev_high + 2 * (pivot - prev_low),     # R3
+        recent_low,
+        recent_high,
+    ]), 2)
+
+    # 合并、去重并排序，只保留在当前价格下方的支撑、上方的阻力
+    cand_s = levels[[0, 1, 2, 6]]
+    cand_r = levels[[3, 4, 5, 7]]
+    supports = np.unique(cand_s[cand_s < current])[::-1][:levels_count].tolist()
+    resistances = np.unique(cand_r[cand_r > current])[:levels_count].tolist()
+
+    # 如果不够，用计算值 (S1 / R1) 补充
     if not supports:
-        supports = [round(s1, 2)]
+        supports = [float(levels[0])]
     if not resistances:
-        resistances = [round(r1, 2)]
+        resistances = [float(levels[3])]
 
-    nearest_support = supports[0] if supports else s1
-    nearest_resistance = resistances[0] if resistances else r1
+    nearest_support = supports[0]
+    nearest_resistance = resistances[0]
 
     # 判断当前位置
     total_range = nearest_resistance - nearest_support
@@ -445,15 +641,15 @@ def support_resistance(df, levels_count=3):
         position = "无法判断"
 
     return {
-        "current_price": round(current, 2),
-        "pivot": round(pivot, 2),
-        "supports": [round(s, 2) for s in supports],
-        "resistances": [round(r, 2) for r in resistances],
-        "nearest_support": round(nearest_support, 2),
-        "nearest_resistance": round(nearest_resistance, 2),
+        "current_price": round(float(current), 2),
+        "pivot": round(float(pivot), 2),
+        "supports": supports,
+        "resistances": resistances,
+        "nearest_support": round(float(nearest_support), 2),
+        "nearest_resistance": round(float(nearest_resistance), 2),
         "position": position,
-        "recent_high": round(recent_high, 2),
-        "recent_low": round(recent_low, 2),
+        "recent_high": round(float(recent_high), 2),
+        "recent_low": round(float(recent_low), 2),
     }
 
 
@@ -467,17 +663,20 @@ def full_prediction(df, symbol="", forecast_days=3):
     """
     result = {
         "symbol": symbol,
-        "current_price": round(float(df['close'].iloc[-1]), 2),
+        "current_price": round(float(df['close'].to_numpy()[-1]), 2),
     }
 
+    # 指标只计算一次，评分和机器学习特征共用
+    indicators = _precompute_indicators(df)
+
     # 1. 综合评分（最快，始终可用）
-    result["scoring"] = score_indicators(df)
+    result["scoring"] = score_indicators(df, indicators)
 
     # 2. 支撑阻力位
     result["levels"] = support_resistance(df)
 
     # 3. 机器学习预测
-    result["ml"] = ml_predict(df, forecast_days)
+    result["ml"] = ml_predict(df, forecast_days, indicators, symbol)
 
     # 综合建议
     score = result["scoring"]["total_score"]
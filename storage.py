@@ -10,11 +10,14 @@
     from quant_backtest.storage import Storage
     db = Storage()
     db.save_quote(...)
+    db.save_quotes_bulk(rows)   # 一轮扫描的行情一次事务写入
     df = db.get_quotes("600519", limit=100)
 """
 
 import os
 import sqlite3
+import threading
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
 import pandas as pd
@@ -23,26 +26,67 @@ import pandas as pd
 DB_PATH = os.path.join(os.path.dirname(__file__), 'data.db')
 
 
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _stamp(ts: Optional[str] = None) -> tuple:
+    """
+    返回 (time 文本, ts 秒级时间戳)。
+    time 列供显示，ts 列用于排序和索引（整数比较比文本快，索引也更小）。
+    """
+    if ts is None:
+        now = datetime.now()
+        return now.strftime(TIME_FORMAT), int(now.timestamp())
+    return ts, int(datetime.strptime(ts, TIME_FORMAT).timestamp())
+
+
 class Storage:
     """SQLite 数据存储"""
 
+    # 行情/信号批量写入的列顺序（time / ts 由写入时统一生成）
+    QUOTE_COLUMNS = ('symbol', 'name', 'market', 'price', 'change_pct',
+                     'rsi', 'sma5', 'sma20', 'volume')
+    SIGNAL_COLUMNS = ('symbol', 'name', 'direction', 'strategy', 'reason', 'price')
+
+    # 插入语句在类定义时生成一次。sqlite3 按 SQL 文本缓存编译好的语句，
+    # 每次写入都传入同一个字符串，只在第一次执行时解析
+    _INSERT_QUOTES = 'INSERT INTO quotes (time, ts, {}) VALUES ({})'.format(
+        ', '.join(QUOTE_COLUMNS), ', '.join('?' * (len(QUOTE_COLUMNS) + 2)))
+    _INSERT_SIGNALS = 'INSERT INTO signals (time, ts, {}) VALUES ({})'.format(
+        ', '.join(SIGNAL_COLUMNS), ', '.join('?' * (len(SIGNAL_COLUMNS) + 2)))
+    _INSERT_LOG = 'INSERT INTO scan_logs (time, ts, level, message) VALUES (?, ?, ?, ?)'
+
+    # 查询显式列出返回的列: ts 只用于排序和索引，不出现在结果中（与加 ts 列之前的结果一致）
+    _SELECT_QUOTES = 'SELECT id, time, {} FROM quotes'.format(', '.join(QUOTE_COLUMNS))
+    _SELECT_SIGNALS = 'SELECT id, time, {} FROM signals'.format(', '.join(SIGNAL_COLUMNS))
+    _SELECT_LOGS = 'SELECT id, time, level, message FROM scan_logs'
+
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
+        # 整个进程共用一个连接（监控线程和 Web 请求线程都会访问），用锁串行化；
+        # 自动提交模式，批量写入时显式 BEGIN/COMMIT。
+        # 不做类型检测、不设 row_factory: 查询结果直接以元组交给 DataFrame，列名取自 cursor.description
+        self._conn = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False, detect_types=0
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._lock = threading.Lock()
         self._init_db()
 
-    def _get_conn(self) -> sqlite3.Connection:
-        """获取数据库连接"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
 
     def _init_db(self):
         """初始化数据库表"""
-        conn = self._get_conn()
-        conn.executescript('''
+        # 只在构造时调用，此时连接尚未被其它线程共享
+        self._conn.executescript('''
             CREATE TABLE IF NOT EXISTS quotes (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 time TEXT NOT NULL,
+                ts INTEGER NOT NULL DEFAULT 0,
                 symbol TEXT NOT NULL,
                 name TEXT,
                 market TEXT,
@@ -57,6 +101,7 @@ class Storage:
             CREATE TABLE IF NOT EXISTS signals (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 time TEXT NOT NULL,
+                ts INTEGER NOT NULL DEFAULT 0,
                 symbol TEXT NOT NULL,
                 name TEXT,
                 direction TEXT,
@@ -68,137 +113,184 @@ class Storage:
             CREATE TABLE IF NOT EXISTS scan_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 time TEXT NOT NULL,
+                ts INTEGER NOT NULL DEFAULT 0,
                 level TEXT,
                 message TEXT
             );
 
+        ''')
+
+        # 旧版数据库没有 ts 列: 补列并由 time 文本（本地时间）回填
+        for table in ('quotes', 'signals', 'scan_logs'):
+            columns = [r[1] for r in self._conn.execute(f'PRAGMA table_info({table})')]
+            if 'ts' not in columns:
+                self._conn.execute(
+                    f'ALTER TABLE {table} ADD COLUMN ts INTEGER NOT NULL DEFAULT 0'
+                )
+                self._conn.execute(
+                    f"UPDATE {table} SET ts = CAST(strftime('%s', time, 'utc') AS INTEGER)"
+                )
+
+        self._conn.executescript('''
+            DROP INDEX IF EXISTS idx_quotes_time;
+            DROP INDEX IF EXISTS idx_signals_time;
             CREATE INDEX IF NOT EXISTS idx_quotes_symbol ON quotes(symbol);
-            CREATE INDEX IF NOT EXISTS idx_quotes_time ON quotes(time);
+            CREATE INDEX IF NOT EXISTS idx_quotes_ts ON quotes(ts);
             CREATE INDEX IF NOT EXISTS idx_signals_symbol ON signals(symbol);
-            CREATE INDEX IF NOT EXISTS idx_signals_time ON signals(time);
+            CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals(ts);
+            CREATE INDEX IF NOT EXISTS idx_logs_ts ON scan_logs(ts);
         ''')
-        conn.commit()
-        conn.close()
 
     # ---- 写入 ----
 
     def save_quote(self, symbol: str, name: str, market: str,
                    price: float, change_pct: float,
                    rsi: float, sma5: float, sma20: float,
-                   volume: float = 0):
+                   volume: float = 0, ts: Optional[str] = None):
         """保存一条行情快照"""
-        conn = self._get_conn()
-        conn.execute(
-            '''INSERT INTO quotes (time, symbol, name, market, price, change_pct, rsi, sma5, sma20, volume)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-             symbol, name, market, price, change_pct, rsi, sma5, sma20, volume)
-        )
-        conn.commit()
-        conn.close()
+        self.save_quotes_bulk([
+            (symbol, name, market, price, change_pct, rsi, sma5, sma20, volume)
+        ], ts)
+
+    def save_quotes_bulk(self, rows: List[tuple], ts: Optional[str] = None):
+        """
+        批量保存行情快照，所有行在一个事务中写入（一次提交）。
+        rows: 按 QUOTE_COLUMNS 顺序排列的元组列表
+        ts: 记录时间 'YYYY-mm-dd HH:MM:SS'，不传则取当前时间
+        """
+        if not rows:
+            return
+        now, epoch = _stamp(ts)
+        self._insert_many(self._INSERT_QUOTES, [(now, epoch, *row) for row in rows])
 
     def save_signal(self, symbol: str, name: str,
                     direction: str, strategy: str,
-                    reason: str, price: float):
+                    reason: str, price: float, ts: Optional[str] = None):
         """保存一条交易信号"""
-        conn = self._get_conn()
-        conn.execute(
-            '''INSERT INTO signals (time, symbol, name, direction, strategy, reason, price)
-               VALUES (?, ?, ?, ?, ?, ?, ?)''',
-            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-             symbol, name, direction, strategy, reason, price)
-        )
-        conn.commit()
-        conn.close()
-
-    def save_log(self, level: str, message: str):
-        """保存一条扫描日志"""
-        conn = self._get_conn()
-        conn.execute(
-            '''INSERT INTO scan_logs (time, level, message)
-               VALUES (?, ?, ?)''',
-            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), level, message)
-        )
-        conn.commit()
-        conn.close()
+        self.save_signals_bulk([(symbol, name, direction, strategy, reason, price)], ts)
+
+    def save_signals_bulk(self, rows: List[tuple], ts: Optional[str] = None):
+        """
+        批量保存交易信号，所有行在一个事务中写入（一次提交）。
+        rows: 按 SIGNAL_COLUMNS 顺序排列的元组列表
+        ts: 记录时间 'YYYY-mm-dd HH:MM:SS'，不传则取当前时间
+        """
+        if not rows:
+            return
+        now, epoch = _stamp(ts)
+        self._insert_many(self._INSERT_SIGNALS, [(now, epoch, *row) for row in rows])
+
+    def save_log(self, level: str, message: str, ts: Optional[str] = None):
+        """保存一条扫描日志（ts 不传则取当前时间）"""
+        now, epoch = _stamp(ts)
+        with self._lock:
+            self._conn.execute(self._INSERT_LOG, (now, epoch, level, message))
+
+    def save_logs_bulk(self, rows: List[tuple]):
+        """
+        批量保存扫描日志，所有行在一个事务中写入（一次提交）。
+        rows: (level, message, when) 元组列表，when 为产生该条日志时的 time.time() 时间戳
+        """
+        if not rows:
+            return
+        self._insert_many(self._INSERT_LOG, [
+            (time.strftime(TIME_FORMAT, time.localtime(when)), int(when), level, message)
+            for level, message, when in rows
+        ])
+
+    def _insert_many(self, sql: str, rows: List[tuple]):
+        """在一个事务中用 executemany 写入多行，出错时回滚"""
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN')
+            try:
+                conn.executemany(sql, rows)
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
 
     # ---- 查询 ----
 
+    def _query_df(self, sql: str, params: tuple) -> pd.DataFrame:
+        """执行查询并直接由结果行构建 DataFrame（不经过 pd.read_sql_query）"""
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            rows = cur.fetchall()
+            columns = [d[0] for d in cur.description]
+        return pd.DataFrame.from_records(rows, columns=columns)
+
     def get_quotes(self, symbol: Optional[str] = None,
                    limit: int = 200) -> pd.DataFrame:
         """
         查询行情记录。
         symbol=None 时返回所有股票的记录。
         """
-        conn = self._get_conn()
         if symbol:
-            df = pd.read_sql_query(
-                'SELECT * FROM quotes WHERE symbol=? ORDER BY time DESC LIMIT ?',
-                conn, params=(symbol, limit)
-            )
-        else:
-            df = pd.read_sql_query(
-                'SELECT * FROM quotes ORDER BY time DESC LIMIT ?',
-                conn, params=(limit,)
+            return self._query_df(
+                self._SELECT_QUOTES + ' WHERE symbol=? ORDER BY ts DESC LIMIT ?',
+                (symbol, limit)
             )
-        conn.close()
-        return df
+        return self._query_df(
+            self._SELECT_QUOTES + ' ORDER BY ts DESC LIMIT ?', (limit,)
+        )
 
     def get_signals(self, symbol: Optional[str] = None,
                     limit: int = 100) -> pd.DataFrame:
         """查询交易信号"""
-        conn = self._get_conn()
         if symbol:
-            df = pd.read_sql_query(
-                'SELECT * FROM signals WHERE symbol=? ORDER BY time DESC LIMIT ?',
-                conn, params=(symbol, limit)
-            )
-        else:
-            df = pd.read_sql_query(
-                'SELECT * FROM signals ORDER BY time DESC LIMIT ?',
-                conn, params=(limit,)
+            return self._query_df(
+                self._SELECT_SIGNALS + ' WHERE symbol=? ORDER BY ts DESC LIMIT ?',
+                (symbol, limit)
             )
-        conn.close()
-        return df
+        return self._query_df(
+            self._SELECT_SIGNALS + ' ORDER BY ts DESC LIMIT ?', (limit,)
+        )
 
     def get_logs(self, limit: int = 200) -> pd.DataFrame:
         """查询扫描日志"""
-        conn = self._get_conn()
-        df = pd.read_sql_query(
-            'SELECT * FROM scan_logs ORDER BY time DESC LIMIT ?',
-            conn, params=(limit,)
+        return self._query_df(
+            self._SELECT_LOGS + ' ORDER BY ts DESC LIMIT ?', (limit,)
         )
-        conn.close()
-        return df
 
     def clear_data(self, tables: List[str] = None):
         """
         清空数据。
         tables: 要清空的表名列表，如 ['quotes','signals','scan_logs']
                 None 则清空全部三张表
+        只删除记录，不回收磁盘空间（空闲页会被后续写入复用）；需要缩小文件时调用 vacuum()。
         """
         allowed = {'quotes', 'signals', 'scan_logs'}
         if tables is None:
             tables = list(allowed)
-        conn = self._get_conn()
-        for t in tables:
-            if t in allowed:
-                conn.execute(f'DELETE FROM {t}')
-        conn.commit()
-        conn.execute('VACUUM')          # 回收磁盘空间
-        conn.close()
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN')
+            for t in tables:
+                if t in allowed:
+                    conn.execute(f'DELETE FROM {t}')
+            conn.execute('COMMIT')
+
+    def vacuum(self):
+        """
+        回收磁盘空间（VACUUM）。
+        会重写整个数据库文件并独占锁库，耗时随文件大小增长，只在需要时显式调用。
+        """
+        with self._lock:
+            self._conn.execute('VACUUM')
+            # WAL 模式下重写的页先写入 WAL，检查点后主文件才会缩小
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
 
     def get_stats(self) -> Dict:
         """获取数据库统计信息"""
-        conn = self._get_conn()
-        cur = conn.cursor()
-        quotes_count = cur.execute('SELECT COUNT(*) FROM quotes').fetchone()[0]
-        signals_count = cur.execute('SELECT COUNT(*) FROM signals').fetchone()[0]
-        logs_count = cur.execute('SELECT COUNT(*) FROM scan_logs').fetchone()[0]
+        with self._lock:
+            cur = self._conn.cursor()
+            quotes_count = cur.execute('SELECT COUNT(*) FROM quotes').fetchone()[0]
+            signals_count = cur.execute('SELECT COUNT(*) FROM signals').fetchone()[0]
+            logs_count = cur.execute('SELECT COUNT(*) FROM scan_logs').fetchone()[0]
 
         # 数据库文件大小
         db_size = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
-        conn.close()
 
         return {
             'quotes_count': quotes_count,
@@ -8,20 +8,23 @@
 示例:
     class MyStrategy(Strategy):
         def init(self):
-            self.sma = sma(self.ctx.data['close'], 20)
+            # 指标转成 ndarray 保存，on_bar 中按下标读取（比 Series.iloc 快得多）
+            self.sma = sma(self.ctx.data['close'], 20).to_numpy()
 
-        def on_bar(self, bar):
-            if bar['close'] > self.sma.iloc[self.ctx.current_idx]:
+        def on_bar(self, bar, idx):
+            if bar['close'] > self.sma[idx]:
                 self.buy()
             elif self.position > 0:
                 self.sell()
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Tuple
+import numpy as np
 import pandas as pd
 
 from ..engine.event import SignalEvent
+from ..broker.order import BUY, SELL, OrderType
 
 
 class Strategy(ABC):
@@ -33,15 +36,13 @@ class Strategy(ABC):
     def __init__(self, name: str = "BaseStrategy"):
         self.name: str = name
         self._context: Optional['StrategyContext'] = None
+        # 策略上下文的快捷访问（普通属性而非 property，on_bar 中读取少一次函数调用）
+        self.ctx: Optional['StrategyContext'] = None
 
     def set_context(self, context: 'StrategyContext') -> None:
         """由引擎调用，注入策略运行时上下文"""
         self._context = context
-
-    @property
-    def ctx(self) -> 'StrategyContext':
-        """策略上下文的快捷访问"""
-        return self._context
+        self.ctx = context
 
     @abstractmethod
     def init(self) -> None:
@@ -52,20 +53,57 @@ class Strategy(ABC):
         pass
 
     @abstractmethod
-    def on_bar(self, bar) -> None:
+    def on_bar(self, bar, idx: Optional[int] = None) -> None:
         """
         每根K线触发的回调，策略核心逻辑所在。
 
         参数:
-            bar: pd.Series，当前K线数据，包含 open/high/low/close/volume
-                 bar.name 为当前日期 (pd.Timestamp)
+            bar: BarData，当前K线数据，包含 open/high/low/close/volume
+                 可用 bar.close 或 bar['close'] 读取；bar.name 为当前日期 (pd.Timestamp)
+            idx: 当前K线下标（同 ctx.current_idx）。只声明了 on_bar(self, bar) 的
+                 子类仍然兼容，引擎只向接受第二个参数的 on_bar 传入下标
         """
         pass
 
     def on_order_filled(self, fill_event) -> None:
-        """订单成交回调（可选覆写）"""
+        """
+        订单成交回调（可选覆写）。
+        fill_event.direction 为 OrderDirection 整数枚举，可与 BUY / SELL 常量比较或用 .name 输出。
+        """
         pass
 
+    def vectorized_signals(
+        self, data: pd.DataFrame
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        向量化信号（可选覆写），在 init() 之后由引擎调用。
+
+        交易规则只依赖预计算指标、且只做"空仓全仓买入 / 持仓全部卖出"的市价单策略，
+        可以返回 (buy_mask, sell_mask) 两个与 data 等长的布尔数组:
+            buy_mask[i]  - 第 i 根K线空仓时买入
+            sell_mask[i] - 第 i 根K线有持仓时卖出
+        引擎随后用编译内核一次算完，不再逐根调用 on_bar。
+        返回 None（默认）表示使用事件驱动路径。
+
+        子类覆写了 on_bar / on_order_filled 时不会走这条路径（见 _vectorized_owner），
+        继承来的向量化信号不代表子类自己的交易逻辑。
+        """
+        return None
+
+    def _vectorized_owner(self) -> Optional[type]:
+        """
+        提供 vectorized_signals 的类；on_bar / on_order_filled 已被更下层的子类覆写
+        （或在实例上替换）时返回 None，此时引擎必须逐根回调。
+        """
+        cls = type(self)
+        owner = next(k for k in cls.__mro__ if 'vectorized_signals' in k.__dict__)
+        if owner is Strategy:
+            return None
+        for name in ('on_bar', 'on_order_filled'):
+            if name in self.__dict__ or getattr(cls, name) is not getattr(owner, name):
+                return None
+        return owner
+
     # ---- 便捷下单方法 ----
 
     def buy(
@@ -86,12 +124,12 @@ class Strategy(ABC):
         signal = SignalEvent(
             datetime=bar.name,
             symbol=self._context._engine.symbol,
-            direction="BUY",
+            direction=BUY,
             volume=volume,
-            order_type=order_type,
+            order_type=OrderType[order_type],
             limit_price=price
         )
-        self._context._engine.event_queue.append(signal)
+        self._context._engine.submit_signal(signal)
 
     def sell(
         self,
@@ -114,12 +152,12 @@ class Strategy(ABC):
         signal = SignalEvent(
             datetime=bar.name,
             symbol=self._context._engine.symbol,
-            direction="SELL",
+            direction=SELL,
             volume=volume,
-            order_type=order_type,
+            order_type=OrderType[order_type],
             limit_price=price
         )
-        self._context._engine.event_queue.append(signal)
+        self._context._engine.submit_signal(signal)
 
     @property
     def position(self) -> int:
@@ -139,6 +177,8 @@ class StrategyContext:
     这是策略与引擎之间的桥梁。
     """
 
+    __slots__ = ('_engine', '_data', '_current_idx')
+
     def __init__(self, engine):
         self._engine = engine
         self._data: pd.DataFrame = engine.data
@@ -154,9 +194,12 @@ class StrategyContext:
         """当前K线在数据中的索引位置"""
         return self._current_idx
 
-    def get_current_bar(self) -> pd.Series:
-        """获取当前K线数据"""
-        return self._data.iloc[self._current_idx]
+    def get_current_bar(self):
+        """获取当前K线数据（主循环中为 BarData，循环开始前为 DataFrame 行）"""
+        bar = self._engine._current_bar
+        if bar is None:
+            return self._data.iloc[self._current_idx]
+        return bar
 
     def get_history(self, n: int = 1) -> pd.DataFrame:
         """获取最近 n 根K线的历史数据（含当前bar）"""
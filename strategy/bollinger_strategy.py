@@ -11,6 +11,8 @@
     - 波动小时带宽收窄（可能预示即将突破）
 """
 
+from typing import Optional
+
 from .base import Strategy
 from .indicators import bollinger_bands
 
@@ -41,25 +43,33 @@ class BollingerStrategy(Strategy):
         self.upper, self.middle, self.lower = bollinger_bands(
             data['close'], self.period, self.num_std
         )
+        self._upper = self.upper.to_numpy()
+        self._lower = self.lower.to_numpy()
+
+        # 触及下轨/上轨一次算成布尔数组，on_bar 每根K线只读一个元素
+        close = data['close'].to_numpy()
+        self._buy_sig = close <= self._lower
+        self._sell_sig = close >= self._upper
+        self._buy_sig[:self.period] = False
+        self._sell_sig[:self.period] = False
 
-    def on_bar(self, bar) -> None:
+    def on_bar(self, bar, idx: Optional[int] = None) -> None:
         """
         交易逻辑:
         - 收盘价 <= 下轨 + 无持仓 -> 买入（价格被低估）
         - 收盘价 >= 上轨 + 有持仓 -> 卖出（价格被高估）
         """
-        idx = self.ctx.current_idx
-        if idx < self.period:
-            return
-
-        close = bar['close']
-        upper = self.upper.iloc[idx]
-        lower = self.lower.iloc[idx]
+        if idx is None:
+            idx = self.ctx.current_idx
 
         # 价格触及下轨 -> 买入
-        if close <= lower and self.position == 0:
+        if self._buy_sig[idx] and self.position == 0:
             self.buy()
 
         # 价格触及上轨 -> 卖出
-        elif close >= upper and self.position > 0:
+        elif self._sell_sig[idx] and self.position > 0:
             self.sell()
+
+    def vectorized_signals(self, data):
+        """触及下轨/上轨的布尔数组（init 中预计算，与 on_bar 使用同一份）"""
+        return self._buy_sig, self._sell_sig
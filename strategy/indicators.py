@@ -1,14 +1,21 @@
 """
 技术指标计算模块。
 所有指标函数接收 pd.Series，返回 pd.Series，便于向量化预计算。
+需要递推或多次滚动的指标调用 indicators_fast 中的编译版本，结果与原 pandas 写法一致。
+未安装 numba（_jit.HAS_NUMBA 为 False）时这些内核只能逐元素解释执行，比 pandas 慢得多，
+此时改用 pandas 实现。
 """
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Tuple
 
+from .._jit import HAS_NUMBA
+from .indicators_fast import ema_nb, rsi_nb, bbands_nb, macd_nb
 
-def sma(series: pd.Series, period: int) -> pd.Series:
+
+def sma(series: pd.Series, period: int = 20) -> pd.Series:
     """
     简单移动平均线 (Simple Moving Average)。
 
@@ -23,12 +30,17 @@ def sma(series: pd.Series, period: int) -> pd.Series:
     return series.rolling(window=period).mean()
 
 
-def ema(series: pd.Series, period: int) -> pd.Series:
+def ema(series: pd.Series, period: int = 20) -> pd.Series:
     """
     指数移动平均线 (Exponential Moving Average)。
     对近期数据赋予更大权重，比 SMA 更灵敏。
+
+    等价于 series.ewm(span=period, adjust=False).mean()，由 ema_nb 单次递推完成。
     """
-    return series.ewm(span=period, adjust=False).mean()
+    if not HAS_NUMBA:
+        return series.ewm(span=period, adjust=False).mean()
+    values = ema_nb(np.ascontiguousarray(series.to_numpy(dtype=np.float64)), period)
+    return pd.Series(values, index=series.index, name=series.name)
 
 
 def rsi(series: pd.Series, period: int = 14) -> pd.Series:
@@ -46,14 +58,33 @@ def rsi(series: pd.Series, period: int = 14) -> pd.Series:
     参数:
         series: 价格序列
         period: 计算周期，默认14
+
+    平均涨跌幅取最近 period 根K线的简单平均（不是 Wilder 平滑），
+    由 rsi_nb 单次遍历完成，不生成中间 Series。
     """
-    delta = series.diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
+    if not HAS_NUMBA:
+        # 涨跌幅拆分和滚动均值都在 ndarray 上完成，最后只包装一次 Series
+        x = series.to_numpy(dtype=np.float64)
+        gain = np.zeros(len(x))
+        loss = np.zeros(len(x))
+        if len(x) > 1:
+            delta = np.diff(x)
+            gain[1:] = np.where(delta > 0, delta, 0.0)
+            loss[1:] = np.where(delta < 0, -delta, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = _rolling_mean(gain, period) / _rolling_mean(loss, period)
+            values = 100 - (100 / (1 + rs))
+        return pd.Series(values, index=series.index, name=series.name)
+    values = rsi_nb(np.ascontiguousarray(series.to_numpy(dtype=np.float64)), period)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _rolling_mean(arr: np.ndarray, window: int) -> np.ndarray:
+    """ndarray 的滚动均值（窗口视图一次计算），前 window-1 个位置为 NaN"""
+    out = np.full(len(arr), np.nan)
+    if len(arr) >= window:
+        out[window - 1:] = sliding_window_view(arr, window).mean(axis=1)
+    return out
 
 
 def bollinger_bands(
@@ -73,12 +104,20 @@ def bollinger_bands(
 
     返回:
         (upper, middle, lower) 三条线的元组
+
+    中轨和标准差由 bbands_nb 在同一次遍历中计算，不再分别做两次 rolling。
     """
-    middle = sma(series, period)
-    std = series.rolling(window=period).std()
-    upper = middle + num_std * std
-    lower = middle - num_std * std
-    return upper, middle, lower
+    if not HAS_NUMBA:
+        middle = series.rolling(window=period).mean()
+        std = series.rolling(window=period).std()
+        return middle + num_std * std, middle, middle - num_std * std
+    upper, middle, lower = bbands_nb(
+        np.ascontiguousarray(series.to_numpy(dtype=np.float64)), period, float(num_std)
+    )
+    index, name = series.index, series.name
+    return (pd.Series(upper, index=index, name=name),
+            pd.Series(middle, index=index, name=name),
+            pd.Series(lower, index=index, name=name))
 
 
 def macd(
@@ -100,13 +139,30 @@ def macd(
 
     返回:
         (macd_line, signal_line, histogram)
+
+    三次 EMA 和两次相减都在 macd_nb 中对 ndarray 完成，最后统一包装成 Series。
     """
-    ema_fast = ema(series, fast)
-    ema_slow = ema(series, slow)
-    macd_line = ema_fast - ema_slow
-    signal_line = ema(macd_line, signal)
-    histogram = macd_line - signal_line
-    return macd_line, signal_line, histogram
+    if not HAS_NUMBA:
+        macd_line = ema(series, fast) - ema(series, slow)
+        signal_line = ema(macd_line, signal)
+        return macd_line, signal_line, macd_line - signal_line
+    macd_line, signal_line, histogram = macd_nb(
+        np.ascontiguousarray(series.to_numpy(dtype=np.float64)), fast, slow, signal
+    )
+    index, name = series.index, series.name
+    return (pd.Series(macd_line, index=index, name=name),
+            pd.Series(signal_line, index=index, name=name),
+            pd.Series(histogram, index=index, name=name))
+
+
+# 指标名 -> 计算函数，参数以关键字形式原样传入
+_DISPATCH = {
+    'SMA': sma,
+    'EMA': ema,
+    'RSI': rsi,
+    'BOLL': bollinger_bands,
+    'MACD': macd,
+}
 
 
 def calculate_indicator(df: pd.DataFrame, name: str, **kwargs):
@@ -123,17 +179,8 @@ def calculate_indicator(df: pd.DataFrame, name: str, **kwargs):
         rsi14 = calculate_indicator(df, "RSI", period=14)
     """
     source = kwargs.pop('source', 'close')
-    series = df[source]
-
-    dispatch = {
-        'SMA': lambda: sma(series, kwargs.get('period', 20)),
-        'EMA': lambda: ema(series, kwargs.get('period', 20)),
-        'RSI': lambda: rsi(series, kwargs.get('period', 14)),
-        'BOLL': lambda: bollinger_bands(series, **kwargs),
-        'MACD': lambda: macd(series, **kwargs),
-    }
 
-    func = dispatch.get(name.upper())
+    func = _DISPATCH.get(name.upper())
     if func is None:
-        raise ValueError(f"不支持的指标: {name}，可用: {list(dispatch.keys())}")
-    return func()
+        raise ValueError(f"不支持的指标: {name}，可用: {list(_DISPATCH.keys())}")
+    return func(df[source], **kwargs)
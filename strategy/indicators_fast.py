@@ -0,0 +1,300 @@
+"""
+技术指标的编译版本（numba 可选，见 _jit.py）。
+
+与 indicators.py 同名指标的计算方式一致，但直接接收 / 返回 float64 ndarray，
+不经过 pandas 的 rolling / ewm 封装。适合每轮对大量标的重复计算的场景
+（如 prediction._precompute_indicators）。
+
+滚动均值 / 标准差和 EMA 按 pandas 相同的递推方式实现（带补偿的滚动和、
+Welford 滚动方差、adjust=False 的指数加权），结果与 pandas 版本一致:
+    - 窗口未满或窗口内有 NaN 时输出 NaN
+    - RSI 与 indicators.rsi 相同，使用简单移动平均（不是 Wilder 平滑）
+
+需要 pd.Series 结果的调用方继续使用 indicators.py。
+
+各函数只读写自己的 ndarray，编译时设置 nogil=True: Web 服务并发获取多个标的时，
+一个线程计算指标的同时其它线程可以继续等待网络 I/O。
+不使用 fastmath，它假定没有 NaN，会破坏上面按 NaN 判断窗口的逻辑。
+"""
+
+import numpy as np
+
+from .._jit import njit
+
+
+@njit(cache=True, nogil=True)
+def sma_nb(x, window):
+    """简单移动平均（等价于 Series.rolling(window).mean()）"""
+    n = x.shape[0]
+    out = np.empty(n)
+    nobs = 0
+    neg_ct = 0
+    sum_x = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    same_ct = 0
+    prev_value = x[0] if n > 0 else 0.0
+
+    for i in range(n):
+        # 移出窗口左端的值（带补偿的减法）
+        if i >= window:
+            val = x[i - window]
+            if val == val:
+                nobs -= 1
+                y = -val - comp_remove
+                t = sum_x + y
+                comp_remove = t - sum_x - y
+                sum_x = t
+                if np.signbit(val):
+                    neg_ct -= 1
+
+        # 加入新值（带补偿的加法）
+        val = x[i]
+        if val == val:
+            nobs += 1
+            y = val - comp_add
+            t = sum_x + y
+            comp_add = t - sum_x - y
+            sum_x = t
+            if np.signbit(val):
+                neg_ct += 1
+            if val == prev_value:
+                same_ct += 1
+            else:
+                same_ct = 1
+            prev_value = val
+
+        if nobs >= window and nobs > 0:
+            result = sum_x / nobs
+            # 窗口内全是同一个值时直接取该值，避免浮点误差
+            if same_ct >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+        else:
+            out[i] = np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rolling_std_nb(x, window):
+    """滚动样本标准差 ddof=1（等价于 Series.rolling(window).std()）"""
+    n = x.shape[0]
+    out = np.empty(n)
+    nobs = 0.0
+    mean_x = 0.0
+    ssqdm_x = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    same_ct = 0
+    prev_value = x[0] if n > 0 else 0.0
+
+    for i in range(n):
+        # 移出窗口左端的值
+        if i >= window:
+            val = x[i - window]
+            if val == val:
+                nobs -= 1
+                if nobs:
+                    prev_mean = mean_x - comp_remove
+                    y = val - comp_remove
+                    t = y - mean_x
+                    comp_remove = t + mean_x - y
+                    mean_x = mean_x - t / nobs
+                    ssqdm_x = ssqdm_x - (val - prev_mean) * (val - mean_x)
+                else:
+                    mean_x = 0.0
+                    ssqdm_x = 0.0
+
+        # 加入新值（Welford 在线方差）
+        val = x[i]
+        if val == val:
+            nobs += 1
+            if val == prev_value:
+                same_ct += 1
+            else:
+                same_ct = 1
+            prev_value = val
+            prev_mean = mean_x - comp_add
+            y = val - comp_add
+            t = y - mean_x
+            comp_add = t + mean_x - y
+            mean_x = mean_x + t / nobs
+            ssqdm_x = ssqdm_x + (val - prev_mean) * (val - mean_x)
+
+        if nobs >= window and nobs > 1:
+            if same_ct >= nobs:
+                out[i] = 0.0
+            else:
+                var = ssqdm_x / (nobs - 1)
+                out[i] = np.sqrt(var) if var > 0 else 0.0
+        else:
+            out[i] = np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def ema_nb(x, span):
+    """指数移动平均（等价于 Series.ewm(span=span, adjust=False).mean()）"""
+    n = x.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    alpha = 2.0 / (span + 1.0)
+    old_wt_factor = 1.0 - alpha
+    new_wt = alpha
+
+    weighted = x[0]
+    nobs = 1 if weighted == weighted else 0
+    out[0] = weighted if nobs >= 1 else np.nan
+    old_wt = 1.0
+    for i in range(1, n):
+        cur = x[i]
+        is_obs = cur == cur
+        if is_obs:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_obs:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted if nobs >= 1 else np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rsi_nb(x, period):
+    """相对强弱指标（与 indicators.rsi 相同: 涨跌幅的简单移动平均之比）"""
+    n = x.shape[0]
+    gain = np.zeros(n)
+    loss = np.zeros(n)
+    for i in range(1, n):
+        delta = x[i] - x[i - 1]
+        if delta > 0:
+            gain[i] = delta
+        elif delta < 0:
+            loss[i] = -delta
+    avg_gain = sma_nb(gain, period)
+    avg_loss = sma_nb(loss, period)
+
+    out = np.empty(n)
+    for i in range(n):
+        g = avg_gain[i]
+        l = avg_loss[i]
+        if l == 0.0:
+            # 只涨不跌 RSI=100；不涨不跌无定义
+            out[i] = 100.0 if g > 0 else np.nan
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + g / l)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def bbands_nb(x, period, num_std):
+    """
+    布林带，返回 (upper, middle, lower)。
+    滚动均值和滚动标准差在同一次遍历中更新，算法分别与 sma_nb / rolling_std_nb 相同。
+    """
+    n = x.shape[0]
+    upper = np.empty(n)
+    middle = np.empty(n)
+    lower = np.empty(n)
+    nobs = 0
+    same_ct = 0
+    prev_value = x[0] if n > 0 else 0.0
+    # 滚动和（带补偿）
+    neg_ct = 0
+    sum_x = 0.0
+    s_comp_add = 0.0
+    s_comp_remove = 0.0
+    # Welford 滚动方差
+    mean_x = 0.0
+    ssqdm_x = 0.0
+    v_comp_add = 0.0
+    v_comp_remove = 0.0
+
+    for i in range(n):
+        # 移出窗口左端的值
+        if i >= period:
+            val = x[i - period]
+            if val == val:
+                nobs -= 1
+                y = -val - s_comp_remove
+                t = sum_x + y
+                s_comp_remove = t - sum_x - y
+                sum_x = t
+                if np.signbit(val):
+                    neg_ct -= 1
+                if nobs:
+                    prev_mean = mean_x - v_comp_remove
+                    y = val - v_comp_remove
+                    t = y - mean_x
+                    v_comp_remove = t + mean_x - y
+                    mean_x = mean_x - t / nobs
+                    ssqdm_x = ssqdm_x - (val - prev_mean) * (val - mean_x)
+                else:
+                    mean_x = 0.0
+                    ssqdm_x = 0.0
+
+        # 加入新值
+        val = x[i]
+        if val == val:
+            nobs += 1
+            y = val - s_comp_add
+            t = sum_x + y
+            s_comp_add = t - sum_x - y
+            sum_x = t
+            if np.signbit(val):
+                neg_ct += 1
+            if val == prev_value:
+                same_ct += 1
+            else:
+                same_ct = 1
+            prev_value = val
+            prev_mean = mean_x - v_comp_add
+            y = val - v_comp_add
+            t = y - mean_x
+            v_comp_add = t + mean_x - y
+            mean_x = mean_x + t / nobs
+            ssqdm_x = ssqdm_x + (val - prev_mean) * (val - mean_x)
+
+        # 中轨
+        if nobs >= period and nobs > 0:
+            mid = sum_x / nobs
+            if same_ct >= nobs:
+                mid = prev_value
+            elif neg_ct == 0 and mid < 0:
+                mid = 0.0
+            elif neg_ct == nobs and mid > 0:
+                mid = 0.0
+        else:
+            mid = np.nan
+
+        # 标准差
+        if nobs >= period and nobs > 1:
+            if same_ct >= nobs:
+                std = 0.0
+            else:
+                var = ssqdm_x / (nobs - 1)
+                std = np.sqrt(var) if var > 0 else 0.0
+        else:
+            std = np.nan
+
+        middle[i] = mid
+        upper[i] = mid + num_std * std
+        lower[i] = mid - num_std * std
+    return upper, middle, lower
+
+
+@njit(cache=True, nogil=True)
+def macd_nb(x, fast, slow, signal):
+    """MACD，返回 (macd_line, signal_line, histogram)"""
+    macd_line = ema_nb(x, fast) - ema_nb(x, slow)
+    signal_line = ema_nb(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
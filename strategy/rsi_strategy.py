@@ -9,6 +9,8 @@ RSI 超买超卖策略。
 适合震荡行情，趋势行情中可能频繁止损。
 """
 
+from typing import Optional
+
 from .base import Strategy
 from .indicators import rsi as calc_rsi
 
@@ -42,23 +44,31 @@ class RSIStrategy(Strategy):
         """预计算 RSI 序列"""
         data = self.ctx.data
         self.rsi_series = calc_rsi(data['close'], self.period)
+        self._rsi = self.rsi_series.to_numpy()
+
+        # 超卖/超买一次算成布尔数组，on_bar 每根K线只读一个元素
+        self._buy_sig = self._rsi < self.oversold
+        self._sell_sig = self._rsi > self.overbought
+        self._buy_sig[:self.period] = False
+        self._sell_sig[:self.period] = False
 
-    def on_bar(self, bar) -> None:
+    def on_bar(self, bar, idx: Optional[int] = None) -> None:
         """
         交易逻辑:
         - RSI 低于超卖线 + 无持仓 -> 买入
         - RSI 高于超买线 + 有持仓 -> 卖出
         """
-        idx = self.ctx.current_idx
-        if idx < self.period:
-            return
-
-        current_rsi = self.rsi_series.iloc[idx]
+        if idx is None:
+            idx = self.ctx.current_idx
 
         # RSI 超卖 -> 买入
-        if current_rsi < self.oversold and self.position == 0:
+        if self._buy_sig[idx] and self.position == 0:
             self.buy()
 
         # RSI 超买 -> 卖出
-        elif current_rsi > self.overbought and self.position > 0:
+        elif self._sell_sig[idx] and self.position > 0:
             self.sell()
+
+    def vectorized_signals(self, data):
+        """超卖/超买的布尔数组（init 中预计算，与 on_bar 使用同一份）"""
+        return self._buy_sig, self._sell_sig
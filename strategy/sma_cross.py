@@ -8,6 +8,10 @@
 这是最经典的趋势跟踪策略之一，适合作为入门学习。
 """
 
+from typing import Optional
+
+import numpy as np
+
 from .base import Strategy
 from .indicators import sma
 
@@ -36,33 +40,41 @@ class SMACrossStrategy(Strategy):
         data = self.ctx.data
         self.sma_short = sma(data['close'], self.short_period)
         self.sma_long = sma(data['close'], self.long_period)
+        # on_bar 按下标读取 ndarray，避免每根K线的 Series.iloc 开销
+        self._short = self.sma_short.to_numpy()
+        self._long = self.sma_long.to_numpy()
+
+        # 金叉/死叉一次算成布尔数组，on_bar 每根K线只读一个元素
+        short, long = self._short, self._long
+        self._buy_sig = np.zeros(len(short), dtype=bool)
+        self._sell_sig = np.zeros(len(short), dtype=bool)
+        self._buy_sig[1:] = (short[:-1] <= long[:-1]) & (short[1:] > long[1:])
+        self._sell_sig[1:] = (short[:-1] >= long[:-1]) & (short[1:] < long[1:])
+        # 等待均线数据充分
+        self._buy_sig[:self.long_period] = False
+        self._sell_sig[:self.long_period] = False
 
-    def on_bar(self, bar) -> None:
+    def on_bar(self, bar, idx: Optional[int] = None) -> None:
         """
         每根K线的判断逻辑:
-        1. 等待长期均线有足够数据
-        2. 比较当前和前一根K线的均线关系
+        1. 等待长期均线有足够数据（预计算时前 long_period 根已置为无信号）
+        2. 比较当前和前一根K线的均线关系（init 中已算成金叉/死叉数组）
         3. 金叉 + 无持仓 -> 买入
         4. 死叉 + 有持仓 -> 卖出
         """
-        idx = self.ctx.current_idx
-        # 等待均线数据充分
-        if idx < self.long_period:
-            return
-
-        # 当前均线值
-        short_now = self.sma_short.iloc[idx]
-        long_now = self.sma_long.iloc[idx]
-        # 前一根K线的均线值
-        short_prev = self.sma_short.iloc[idx - 1]
-        long_prev = self.sma_long.iloc[idx - 1]
+        if idx is None:
+            idx = self.ctx.current_idx
 
         # 金叉: 短均线从下方穿越长均线
-        if short_prev <= long_prev and short_now > long_now:
+        if self._buy_sig[idx]:
             if self.position == 0:
                 self.buy()  # 全仓买入
 
         # 死叉: 短均线从上方穿越长均线
-        elif short_prev >= long_prev and short_now < long_now:
+        elif self._sell_sig[idx]:
             if self.position > 0:
                 self.sell()  # 卖出全部
+
+    def vectorized_signals(self, data):
+        """金叉/死叉的布尔数组（init 中预计算，与 on_bar 使用同一份）"""
+        return self._buy_sig, self._sell_sig
@@ -133,11 +133,16 @@ class BacktestCharts:
             return
 
         equity = self.equity_curve['total_equity']
-        running_max = np.maximum.accumulate(equity)
-        drawdown = (running_max - equity) / running_max * 100
+        # 回撤百分比 = (历史最高 - 当前) / 历史最高 * 100，在一块缓冲区上原地计算，
+        # 不生成带索引对齐的中间 Series
+        eq = equity.to_numpy(dtype=float)
+        running_max = np.maximum.accumulate(eq)
+        drawdown = np.subtract(running_max, eq)
+        np.divide(drawdown, running_max, out=drawdown)
+        drawdown *= -100.0  # 画在零轴下方
 
-        ax.fill_between(equity.index, 0, -drawdown, color='red', alpha=0.3)
-        ax.plot(equity.index, -drawdown, color='red', linewidth=0.8)
+        ax.fill_between(equity.index, 0, drawdown, color='red', alpha=0.3)
+        ax.plot(equity.index, drawdown, color='red', linewidth=0.8)
 
         ax.set_title('回撤曲线', fontsize=12)
         ax.set_ylabel('回撤 (%)')
@@ -173,9 +178,9 @@ class BacktestCharts:
             self._plot_simple_price(last_n)
             return
 
-        plot_data = self.data.tail(last_n).copy()
-        # mplfinance 要求列名首字母大写
-        plot_data.columns = [c.capitalize() for c in plot_data.columns]
+        # mplfinance 要求列名首字母大写。rename 返回新对象，写时复制下不复制数据，
+        # 也不会改动 self.data
+        plot_data = self.data.tail(last_n).rename(columns=str.capitalize)
 
         # 构建买卖标记
         addplots = []
@@ -214,15 +219,17 @@ class BacktestCharts:
         if signals.empty:
             return None
 
-        signal_series = pd.Series(np.nan, index=data.index)
-        for _, trade in signals.iterrows():
-            dt = trade['datetime']
-            if dt in data.index:
-                signal_series[dt] = trade['price']
-
-        if signal_series.isna().all():
+        # 同一根K线有多笔同向成交时取最后一笔；一次查出所有成交在K线中的位置，
+        # 不在显示区间内的（位置为 -1）丢弃
+        signals = signals.drop_duplicates('datetime', keep='last')
+        pos = data.index.get_indexer(signals['datetime'])
+        found = pos >= 0
+        if not found.any():
             return None
-        return signal_series
+
+        values = np.full(len(data), np.nan)
+        values[pos[found]] = signals['price'].to_numpy(dtype=float)[found]
+        return pd.Series(values, index=data.index)
 
     def _plot_simple_price(self, last_n: int) -> None:
         """简单折线图（mplfinance 不可用时的备选方案）"""
@@ -7,6 +7,8 @@ import sys
 import os
 import time
 import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # ---- 路径处理（兼容 PyInstaller 打包） ----
@@ -22,11 +24,23 @@ else:
 from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO
 
+import numpy as np
 import pandas as pd
+from quant_backtest._jit import njit
 from quant_backtest.strategy.indicators import sma, rsi, bollinger_bands
 from quant_backtest.storage import Storage
 from quant_backtest.prediction import full_prediction
 
+# 行情源在模块加载时导入一次；未安装的数据源在获取时报错，由各自的回退逻辑处理
+try:
+    import akshare as ak
+except ImportError:
+    ak = None
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None
+
 # 数据库放在运行目录（exe 旁边），这样数据不会丢
 db = Storage(db_path=os.path.join(RUN_DIR, 'data.db'))
 
@@ -36,6 +50,10 @@ app = Flask(
     static_folder=os.path.join(BASE_DIR, 'web', 'static'),
 )
 app.config['SECRET_KEY'] = 'quant-monitor-2024'
+# 图表/回测接口返回数百个小字典，不对每个字典的键排序；数值已在接口中按显示精度取整
+app.json.sort_keys = False
+# threading 模式下 socketio.run 以多线程方式运行 Werkzeug，每个请求一个线程，
+# 图表/预测/回测接口的网络等待互不阻塞。后台任务统一用 socketio.start_background_task 启动
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 
@@ -73,9 +91,13 @@ class MonitorState:
             {"symbol": "USDCNY=X",  "name": "美元/人民币",  "market": "FX"},
             {"symbol": "GBPCNY=X",  "name": "英镑/人民币",  "market": "FX"},
         ]
+        # symbol -> stock，与 stocks 列表中的同一个 dict，增删时同步维护
+        self.stocks_by_symbol = {s['symbol']: s for s in self.stocks}
         self.last_signals = {}  # 避免重复信号
         self.scan_count = 0
         self.usdcny_rate = None  # 缓存美元兑人民币汇率
+        # 停止监控时 set，等待下一轮的监控线程立即醒来退出
+        self.stop_event = threading.Event()
 
 state = MonitorState()
 
@@ -84,6 +106,20 @@ state = MonitorState()
 #  数据获取
 # ============================================================
 
+# symbol -> yf.Ticker，每轮扫描复用同一个对象（构造时有会话和元数据初始化开销）
+_TICKER_CACHE = {}
+
+
+def _get_ticker(symbol):
+    """获取（并缓存）yfinance 的 Ticker 对象"""
+    if yf is None:
+        raise ImportError("未安装 yfinance")
+    ticker = _TICKER_CACHE.get(symbol)
+    if ticker is None:
+        ticker = _TICKER_CACHE.setdefault(symbol, yf.Ticker(symbol))
+    return ticker
+
+
 def _fetch_a_share(symbol, start_date, end_date):
     """
     获取A股K线数据。
@@ -91,7 +127,8 @@ def _fetch_a_share(symbol, start_date, end_date):
     """
     # ---- 方案1: akshare ----
     try:
-        import akshare as ak
+        if ak is None:
+            raise ImportError("未安装 akshare")
         start_fmt = start_date.replace("-", "")
         end_fmt = end_date.replace("-", "")
         df = ak.stock_zh_a_hist(
@@ -113,10 +150,8 @@ def _fetch_a_share(symbol, start_date, end_date):
 
     # ---- 方案2: yfinance (上交所=.SS 深交所=.SZ) ----
     try:
-        import yfinance as yf
         suffix = '.SS' if symbol.startswith('6') else '.SZ'
-        yf_symbol = symbol + suffix
-        ticker = yf.Ticker(yf_symbol)
+        ticker = _get_ticker(symbol + suffix)
         df = ticker.history(start=start_date, end=end_date)
         if df is not None and not df.empty:
             df.columns = [c.lower() for c in df.columns]
@@ -132,10 +167,42 @@ def _fetch_a_share(symbol, start_date, end_date):
     return None
 
 
-def fetch_data(symbol, market, days=120):
-    """获取最近 N 天K线数据"""
+def _date_range(days):
+    """K线请求的起止日期（多取一倍自然日，保证 tail(days) 后交易日足够）"""
     end_date = datetime.now().strftime("%Y-%m-%d")
     start_date = (datetime.now() - timedelta(days=days * 2)).strftime("%Y-%m-%d")
+    return start_date, end_date
+
+
+def _normalize_yf(df):
+    """yfinance 返回的K线统一为小写 OHLCV 列、无时区索引"""
+    df.columns = [c.lower() for c in df.columns]
+    keep = [c for c in ['open', 'high', 'low', 'close', 'volume'] if c in df.columns]
+    df = df[keep]
+    df.index.name = 'datetime'
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    # 外汇数据通常无成交量，补0
+    if 'volume' not in df.columns:
+        df['volume'] = 0
+    return df
+
+
+def _finish_frame(df, days):
+    """截取最近 days 根K线；不足30根返回 None"""
+    df = df.tail(days)
+    if len(df) < 30:
+        return None
+    # 获取时记录一次是否有成交量，预测模块直接读取该标记
+    df.attrs['has_volume'] = (
+        'volume' in df.columns and bool((df['volume'].to_numpy() > 0).any())
+    )
+    return df
+
+
+def fetch_data(symbol, market, days=120):
+    """获取最近 N 天K线数据"""
+    start_date, end_date = _date_range(days)
 
     try:
         if market == "A":
@@ -143,89 +210,209 @@ def fetch_data(symbol, market, days=120):
             if df is None:
                 return None
         elif market in ("US", "FX"):
-            import yfinance as yf
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(start=start_date, end=end_date)
+            df = _get_ticker(symbol).history(start=start_date, end=end_date)
             if df is None or df.empty:
                 return None
-            df.columns = [c.lower() for c in df.columns]
-            keep = [c for c in ['open', 'high', 'low', 'close', 'volume'] if c in df.columns]
-            df = df[keep]
-            df.index.name = 'datetime'
-            if df.index.tz is not None:
-                df.index = df.index.tz_localize(None)
-            # 外汇数据通常无成交量，补0
-            if 'volume' not in df.columns:
-                df['volume'] = 0
+            df = _normalize_yf(df)
         else:
             return None
 
-        df = df.tail(days)
-        if len(df) < 30:
-            return None
-        return df
+        return _finish_frame(df, days)
     except Exception as e:
         emit_log(f"[错误] 获取 {symbol} 数据失败: {e}", "error")
         return None
 
 
+# (symbol, market, days) -> (获取时的 monotonic 时间, df)。
+# 监控轮次刚获取的K线，预测/回测等接口在有效期内直接复用，不再重复请求；
+# 有效期取刷新间隔和 DATA_CACHE_TTL 中较小的一个。缓存的 df 由多个调用方共享，不要原地修改
+DATA_CACHE_TTL = 300
+_DATA_CACHE_SIZE = 128
+_DATA_CACHE = {}
+_data_cache_lock = threading.Lock()
+
+
+def remember_data(symbol, market, days, df):
+    """把获取到的K线放入短期缓存"""
+    if df is None:
+        return
+    with _data_cache_lock:
+        _DATA_CACHE.pop((symbol, market, days), None)
+        _DATA_CACHE[(symbol, market, days)] = (time.monotonic(), df)
+        if len(_DATA_CACHE) > _DATA_CACHE_SIZE:
+            # dict 按插入顺序排列，第一个即最早放入的
+            del _DATA_CACHE[next(iter(_DATA_CACHE))]
+
+
+def get_data(symbol, market, days=120):
+    """带短期缓存的 fetch_data：有效期内直接返回缓存，否则重新获取并缓存"""
+    with _data_cache_lock:
+        hit = _DATA_CACHE.get((symbol, market, days))
+    if hit is not None and time.monotonic() - hit[0] < min(state.interval, DATA_CACHE_TTL):
+        return hit[1]
+    df = fetch_data(symbol, market, days)
+    remember_data(symbol, market, days, df)
+    return df
+
+
+def drop_cached_data(symbol):
+    """移除某个标的的K线缓存（增删监控时调用）"""
+    with _data_cache_lock:
+        for key in [k for k in _DATA_CACHE if k[0] == symbol]:
+            del _DATA_CACHE[key]
+
+
+def fetch_yf_batch(symbols, days=120):
+    """
+    一次请求批量获取多个美股/外汇标的的最近 N 天K线（yfinance.download 多标的模式）。
+    返回 {symbol: df}，每个 df 的处理与 fetch_data 相同；
+    整批失败或某个标的无数据时结果中不含该标的，由调用方逐个回退到 fetch_data。
+    """
+    if not symbols:
+        return {}
+    start_date, end_date = _date_range(days)
+    try:
+        if yf is None:
+            raise ImportError("未安装 yfinance")
+        raw = yf.download(
+            symbols, start=start_date, end=end_date, group_by='ticker',
+            auto_adjust=True, threads=True, progress=False,
+        )
+    except Exception as e:
+        emit_log(f"[警告] 批量获取美股/外汇数据失败，改为逐个获取: {e}", "warning")
+        return {}
+    if raw is None or raw.empty or raw.columns.nlevels < 2:
+        return {}
+
+    frames = {}
+    tickers = set(raw.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in tickers:
+            continue
+        try:
+            # 各标的交易日不同，合并表中其它标的交易日的整行 NaN 要去掉
+            df = raw[symbol].dropna(how='all')
+            if df.empty:
+                continue
+            df = _finish_frame(_normalize_yf(df), days)
+        except Exception:
+            continue
+        if df is not None:
+            frames[symbol] = df
+    return frames
+
+
 # ============================================================
 #  信号检测
 # ============================================================
 
-def detect_signals(symbol, df):
-    """检测所有策略信号"""
-    signals = []
+def compute_indicators(df):
+    """
+    计算信号检测和行情摘要共用的指标，每个标的每轮只算一次。
+    返回 {名称: ndarray}: sma5, sma20, rsi14, boll_upper, boll_lower
+    （布林带中轨就是 20 日均线，直接作为 sma20，不再单独计算）
+    """
     close = df['close']
+    upper, middle, lower = bollinger_bands(close, 20, 2.0)
+    return {
+        'sma5': sma(close, 5).to_numpy(),
+        'sma20': middle.to_numpy(),
+        'rsi14': rsi(close, 14).to_numpy(),
+        'boll_upper': upper.to_numpy(),
+        'boll_lower': lower.to_numpy(),
+    }
+
+
+# (symbol, K线数量, 首尾时间戳, 最新收盘价) -> compute_indicators 的结果，LRU 淘汰。
+# 同一根K线内多次请求同一标的（监控轮次、图表、回测）直接复用；
+# 最新一根K线价格变化或窗口长度不同都会得到新的键
+_IND_CACHE = OrderedDict()
+_IND_CACHE_SIZE = 256
+_ind_cache_lock = threading.Lock()
+
+
+def indicators_for(symbol, df):
+    """带缓存的 compute_indicators，返回的数组由多个调用方共享，不要原地修改"""
+    index = df.index
+    key = (symbol, len(df), index[0], index[-1], float(df['close'].iloc[-1]))
+    with _ind_cache_lock:
+        ind = _IND_CACHE.get(key)
+        if ind is not None:
+            _IND_CACHE.move_to_end(key)
+            return ind
+    ind = compute_indicators(df)
+    with _ind_cache_lock:
+        _IND_CACHE[key] = ind
+        if len(_IND_CACHE) > _IND_CACHE_SIZE:
+            _IND_CACHE.popitem(last=False)
+    return ind
+
+
+def drop_cached_indicators(symbol):
+    """移除某个标的的全部指标缓存（取消监控时调用）"""
+    with _ind_cache_lock:
+        for key in [k for k in _IND_CACHE if k[0] == symbol]:
+            del _IND_CACHE[key]
+
+
+def detect_signals(symbol, df, ind=None):
+    """
+    检测所有策略信号。
+    ind: compute_indicators 的结果，不传则内部计算
+    """
+    signals = []
+    n = len(df)
+    # 各策略的信号价格都是最新收盘价，只取一次
+    last_close = float(df['close'].iloc[-1])
+    if ind is None:
+        ind = compute_indicators(df)
 
     # SMA 交叉
-    if len(df) >= 21:
-        sma5 = sma(close, 5)
-        sma20 = sma(close, 20)
-        s_now, l_now = sma5.iloc[-1], sma20.iloc[-1]
-        s_prev, l_prev = sma5.iloc[-2], sma20.iloc[-2]
+    if n >= 21:
+        sma5, sma20 = ind['sma5'], ind['sma20']
+        s_now, l_now = sma5[-1], sma20[-1]
+        s_prev, l_prev = sma5[-2], sma20[-2]
         key = f"{symbol}_SMA"
         if s_prev <= l_prev and s_now > l_now:
             if is_new_signal(key, "BUY"):
                 signals.append({
                     "strategy": "SMA交叉(5/20)", "direction": "BUY",
                     "reason": f"5日均线({s_now:.2f})上穿20日均线({l_now:.2f})",
-                    "price": float(close.iloc[-1]),
+                    "price": last_close,
                 })
         elif s_prev >= l_prev and s_now < l_now:
             if is_new_signal(key, "SELL"):
                 signals.append({
                     "strategy": "SMA交叉(5/20)", "direction": "SELL",
                     "reason": f"5日均线({s_now:.2f})下穿20日均线({l_now:.2f})",
-                    "price": float(close.iloc[-1]),
+                    "price": last_close,
                 })
 
     # RSI
-    if len(df) >= 15:
-        rsi_val = rsi(close, 14).iloc[-1]
+    if n >= 15:
+        rsi_val = ind['rsi14'][-1]
         key = f"{symbol}_RSI"
         if rsi_val < 30:
             if is_new_signal(key, "BUY"):
                 signals.append({
                     "strategy": "RSI(14)", "direction": "BUY",
                     "reason": f"RSI={rsi_val:.1f} < 30 (超卖)",
-                    "price": float(close.iloc[-1]),
+                    "price": last_close,
                 })
         elif rsi_val > 70:
             if is_new_signal(key, "SELL"):
                 signals.append({
                     "strategy": "RSI(14)", "direction": "SELL",
                     "reason": f"RSI={rsi_val:.1f} > 70 (超买)",
-                    "price": float(close.iloc[-1]),
+                    "price": last_close,
                 })
         else:
             state.last_signals.pop(key, None)
 
     # 布林带
-    if len(df) >= 21:
-        upper, middle, lower = bollinger_bands(close, 20, 2.0)
-        c = float(close.iloc[-1])
-        u, l = float(upper.iloc[-1]), float(lower.iloc[-1])
+    if n >= 21:
+        c = last_close
+        u, l = float(ind['boll_upper'][-1]), float(ind['boll_lower'][-1])
         key = f"{symbol}_BOLL"
         if c <= l:
             if is_new_signal(key, "BUY"):
@@ -255,14 +442,19 @@ def is_new_signal(key, direction):
     return True
 
 
-def get_stock_info(df, decimals=2):
-    """计算当前行情摘要"""
+def get_stock_info(df, decimals=2, ind=None):
+    """
+    计算当前行情摘要。
+    ind: compute_indicators 的结果，不传则内部计算
+    """
+    if ind is None:
+        ind = compute_indicators(df)
     close = float(df['close'].iloc[-1])
     prev_close = float(df['close'].iloc[-2])
     change = (close - prev_close) / prev_close * 100
-    rsi_val = float(rsi(df['close'], 14).iloc[-1])
-    sma5_val = float(sma(df['close'], 5).iloc[-1])
-    sma20_val = float(sma(df['close'], 20).iloc[-1])
+    rsi_val = float(ind['rsi14'][-1])
+    sma5_val = float(ind['sma5'][-1])
+    sma20_val = float(ind['sma20'][-1])
     return {
         "price": round(close, decimals),
         "change": round(change, 2),
@@ -272,12 +464,62 @@ def get_stock_info(df, decimals=2):
     }
 
 
+# 行情获取线程池（网络 I/O 为主），监控循环和批量获取共用，进程内常驻
+_FETCH_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix='fetch')
+
+
+def _fetch_and_summarize(stock, df=None):
+    """
+    获取单个标的K线，计算指标和行情摘要（在线程池中执行，不修改共享状态）。
+    指标随结果返回，信号检测直接复用。已批量获取到的K线通过 df 传入。
+    """
+    if df is None:
+        df = fetch_data(stock['symbol'], stock['market'])
+    if df is None:
+        return None, None, None
+    # 每轮都重新获取，结果放入缓存供预测/回测接口复用
+    remember_data(stock['symbol'], stock['market'], 120, df)
+    ind = indicators_for(stock['symbol'], df)
+    # 外汇用4位小数，其它用2位
+    decimals = 4 if stock['market'] == 'FX' else 2
+    return df, get_stock_info(df, decimals=decimals, ind=ind), ind
+
+
+def _summarize_from_batch(stock, batch):
+    """从批量下载结果中取K线；批量结果中没有的标的（含整批失败）回退到单独获取"""
+    # 批量下载任务先于本任务提交，线程池按提交顺序取任务，这里等待不会占满线程池
+    return _fetch_and_summarize(stock, batch.result().get(stock['symbol']))
+
+
+def submit_fetch_all(stocks):
+    """
+    把所有标的的获取任务提交到 _FETCH_POOL，立即返回与 stocks 顺序一致的 Future 列表，
+    每个 Future 的结果为 (df, info, ind)，获取失败的为 (None, None, None)。
+    A股逐个请求；美股/外汇先一次批量下载，再各自从批量结果中取数据。
+    """
+    yf_symbols = [s['symbol'] for s in stocks if s['market'] in ('US', 'FX')]
+    batch = _FETCH_POOL.submit(fetch_yf_batch, yf_symbols) if len(yf_symbols) > 1 else None
+    futures = []
+    for s in stocks:
+        if batch is not None and s['market'] in ('US', 'FX'):
+            futures.append(_FETCH_POOL.submit(_summarize_from_batch, s, batch))
+        else:
+            futures.append(_FETCH_POOL.submit(_fetch_and_summarize, s))
+    return futures
+
+
+def fetch_all(stocks):
+    """
+    并发获取所有标的数据（行情获取是网络 I/O，整轮耗时约等于最慢的一次请求）。
+    返回与 stocks 顺序一致的 [(df, info, ind), ...]，获取失败的为 (None, None, None)。
+    """
+    return [f.result() for f in submit_fetch_all(stocks)]
+
+
 def fetch_usdcny_rate():
     """获取最新美元兑人民币汇率"""
     try:
-        import yfinance as yf
-        ticker = yf.Ticker("USDCNY=X")
-        df = ticker.history(period="5d")
+        df = _get_ticker("USDCNY=X").history(period="5d")
         if df is not None and not df.empty:
             rate = float(df['Close'].iloc[-1])
             state.usdcny_rate = rate
@@ -287,37 +529,35 @@ def fetch_usdcny_rate():
     return state.usdcny_rate  # 返回缓存值
 
 
-def push_rmb_commodity(symbol_usd, name_rmb, usdcny_rate, df_usd):
+def push_rmb_commodity(symbol_usd, name_rmb, usdcny_rate, df_usd,
+                       quote_rows, signal_rows):
     """
     将美元计价的商品转换为人民币价格并推送。
     黄金: 美元/盎司 → 人民币/克 (1盎司=31.1035克)
     白银: 美元/盎司 → 人民币/克
+    行情和信号追加到 quote_rows / signal_rows，由监控循环在本轮结束时批量入库。
     """
     if df_usd is None or usdcny_rate is None:
         return
 
     oz_to_gram = 31.1035
-    # 转换为人民币/克
-    df_rmb = df_usd.copy()
-    for col in ['open', 'high', 'low', 'close']:
-        if col in df_rmb.columns:
-            df_rmb[col] = df_rmb[col] * usdcny_rate / oz_to_gram
+    # 转换为人民币/克。下游的指标、行情摘要和信号检测只读收盘价，
+    # 只换算 close 一列，不复制整张K线表
+    k = usdcny_rate / oz_to_gram
+    df_rmb = pd.DataFrame(
+        {'close': df_usd['close'].to_numpy(dtype=float) * k}, index=df_usd.index
+    )
 
     rmb_symbol = symbol_usd.replace("=F", "_CNY")
-    info = get_stock_info(df_rmb, decimals=2)
+    ind = indicators_for(rmb_symbol, df_rmb)
+    info = get_stock_info(df_rmb, decimals=2, ind=ind)
 
     stock_rmb = {"symbol": rmb_symbol, "name": name_rmb, "market": "CNY"}
     emit_quote(stock_rmb, info)
-    try:
-        db.save_quote(
-            symbol=rmb_symbol, name=name_rmb,
-            market="CNY", price=info['price'],
-            change_pct=info['change'], rsi=info['rsi'],
-            sma5=info['sma5'], sma20=info['sma20'],
-            volume=0
-        )
-    except Exception:
-        pass
+    quote_rows.append((
+        rmb_symbol, name_rmb, "CNY", info['price'], info['change'],
+        info['rsi'], info['sma5'], info['sma20'], 0
+    ))
     emit_log(
         f"{name_rmb} 价格:{info['price']}元/克 "
         f"({'+' if info['change'] >= 0 else ''}{info['change']:.2f}%) "
@@ -325,7 +565,7 @@ def push_rmb_commodity(symbol_usd, name_rmb, usdcny_rate, df_usd):
     )
 
     # 信号检测
-    signals = detect_signals(rmb_symbol, df_rmb)
+    signals = detect_signals(rmb_symbol, df_rmb, ind)
     for sig in signals:
         emit_signal(stock_rmb, sig)
         direction_cn = "买入" if sig['direction'] == 'BUY' else "卖出"
@@ -334,39 +574,124 @@ def push_rmb_commodity(symbol_usd, name_rmb, usdcny_rate, df_usd):
             f"{sig['strategy']}: {sig['reason']}",
             "signal"
         )
-        try:
-            db.save_signal(
-                symbol=rmb_symbol, name=name_rmb,
-                direction=sig['direction'], strategy=sig['strategy'],
-                reason=sig['reason'], price=sig['price']
-            )
-        except Exception:
-            pass
+        signal_rows.append((
+            rmb_symbol, name_rmb, sig['direction'], sig['strategy'],
+            sig['reason'], sig['price']
+        ))
 
 
 # ============================================================
 #  日志推送
 # ============================================================
 
+# 推送给前端的事件和待入库的日志先进入队列，由后台线程每 FLUSH_INTERVAL 秒合并处理:
+# 事件按产生顺序合并为一条 'event_batch' 推送，日志在一个事务中批量入库。
+# 调用方（监控线程、Web 请求）只做一次 deque.append，不等待网络和磁盘。
+# 队列有长度上限，推送或入库持续失败时丢弃最早的元素，不会无限占用内存
+FLUSH_INTERVAL = 0.25
+_EVENT_QUEUE = deque(maxlen=10000)  # (事件名, 数据)
+_LOG_QUEUE = deque(maxlen=10000)    # (level, message, time.time())
+_DB_QUEUE = deque(maxlen=1000)      # (写入函数, 参数)，行情/信号的批量入库，每轮扫描一条
+_flusher_lock = threading.Lock()
+_flusher_started = False
+
+
+_ts_cache = (None, '')  # (整秒时间戳, 'HH:MM:SS')
+
+
+def _now_str(t=None):
+    """当前时间 'HH:MM:SS'，同一秒内的事件复用已格式化的字符串"""
+    global _ts_cache
+    if t is None:
+        t = time.time()
+    sec = int(t)
+    cached = _ts_cache
+    if cached[0] != sec:
+        cached = (sec, time.strftime("%H:%M:%S", time.localtime(sec)))
+        _ts_cache = cached
+    return cached[1]
+
+
+def _drain(queue):
+    """取出队列中当前的全部元素（append/popleft 线程安全，不需要加锁）"""
+    items = []
+    try:
+        while True:
+            items.append(queue.popleft())
+    except IndexError:
+        pass
+    return items
+
+
+def _flush_events():
+    """推送并入库队列中积压的事件和日志"""
+    events = _drain(_EVENT_QUEUE)
+    if events:
+        try:
+            socketio.emit('event_batch', events)
+        except Exception:
+            pass
+    rows = _drain(_LOG_QUEUE)
+    if rows:
+        try:
+            db.save_logs_bulk(rows)
+        except Exception:
+            pass
+    for func, args in _drain(_DB_QUEUE):
+        try:
+            func(*args)
+        except Exception:
+            pass
+
+
+def _event_flusher():
+    # 任何异常都不能结束这个线程: _flusher_started 已为 True 不会再启动，
+    # 线程一旦退出，之后的日志、行情、信号都只会留在队列里
+    while True:
+        socketio.sleep(FLUSH_INTERVAL)
+        try:
+            _flush_events()
+        except Exception:
+            pass
+
+
+def _ensure_flusher():
+    """第一次入队时启动后台推送线程"""
+    global _flusher_started
+    if not _flusher_started:
+        with _flusher_lock:
+            if not _flusher_started:
+                socketio.start_background_task(_event_flusher)
+                _flusher_started = True
+
+
+def _queue_event(name, data):
+    """事件入队"""
+    _EVENT_QUEUE.append((name, data))
+    _ensure_flusher()
+
+
+def queue_db_write(func, *args):
+    """数据库写入入队，由后台线程按入队顺序执行（出错忽略，与同步写入时一致）"""
+    _DB_QUEUE.append((func, args))
+    _ensure_flusher()
+
+
 def emit_log(message, level="info"):
-    """通过 WebSocket 推送日志到前端，同时存入数据库"""
-    now = datetime.now().strftime("%H:%M:%S")
-    socketio.emit('log', {
-        'time': now,
+    """推送日志到前端，同时存入数据库（均由后台线程批量完成）"""
+    now = time.time()
+    _LOG_QUEUE.append((level, message, now))
+    _queue_event('log', {
+        'time': _now_str(now),
         'message': message,
         'level': level,
     })
-    try:
-        db.save_log(level, message)
-    except Exception:
-        pass
 
 
 def emit_signal(stock, signal):
     """推送交易信号到前端"""
-    now = datetime.now().strftime("%H:%M:%S")
-    socketio.emit('signal', {
-        'time': now,
+    _queue_event('signal', {
+        'time': _now_str(),
         'symbol': stock['symbol'],
         'name': stock['name'],
         'direction': signal['direction'],
@@ -378,7 +703,7 @@ def emit_signal(stock, signal):
 
 def emit_quote(stock, info):
     """推送行情数据到前端"""
-    socketio.emit('quote', {
+    _queue_event('quote', {
         'symbol': stock['symbol'],
         'name': stock['name'],
         'market': stock['market'],
@@ -398,11 +723,18 @@ def monitor_loop():
 
     while state.running:
         state.scan_count += 1
+        # 本轮写入数据库的记录统一使用扫描开始时间，只格式化一次
+        scan_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         emit_log(f"--- 第 {state.scan_count} 次扫描 ---", "info")
 
-        # 先获取美元/人民币汇率（用于后续人民币换算）
+        # 汇率和所有标的同时开始获取，汇率用于后续人民币换算
+        stocks = list(state.stocks)
         emit_log("获取美元/人民币汇率...")
-        usdcny = fetch_usdcny_rate()
+        rate_future = _FETCH_POOL.submit(fetch_usdcny_rate)
+        emit_log(f"获取 {len(stocks)} 个标的数据...")
+        futures = submit_fetch_all(stocks)
+
+        usdcny = rate_future.result()
         if usdcny:
             emit_log(f"当前汇率: 1 USD = {usdcny:.4f} CNY")
         else:
@@ -412,35 +744,27 @@ def monitor_loop():
         commodity_data = {}  # symbol -> df
         # 本轮所有信号收集（用于汇总邮件）
         all_signals_this_scan = []
+        # 本轮行情/信号记录，扫描结束后一次事务批量入库
+        quote_rows = []
+        signal_rows = []
 
-        for stock in list(state.stocks):
-            if not state.running:
+        # 按列表顺序在本线程推送、检测信号；每个标的一拿到结果就处理，不等整轮获取完
+        for stock, future in zip(stocks, futures):
+            if state.stop_event.is_set():
                 break
-
-            emit_log(f"获取 {stock['name']}({stock['symbol']}) 数据...")
-            df = fetch_data(stock['symbol'], stock['market'])
+            df, info, ind = future.result()
 
             if df is None:
                 emit_log(f"{stock['symbol']} 数据获取失败", "warning")
                 continue
 
-            # 外汇用4位小数，其它用2位
-            decimals = 4 if stock['market'] == 'FX' else 2
-
-            # 推送行情并存入数据库
-            info = get_stock_info(df, decimals=decimals)
+            # 推送行情，记录稍后批量入库
             emit_quote(stock, info)
-            try:
-                vol = float(df['volume'].iloc[-1]) if 'volume' in df.columns else 0
-                db.save_quote(
-                    symbol=stock['symbol'], name=stock['name'],
-                    market=stock['market'], price=info['price'],
-                    change_pct=info['change'], rsi=info['rsi'],
-                    sma5=info['sma5'], sma20=info['sma20'],
-                    volume=vol
-                )
-            except Exception:
-                pass
+            vol = float(df['volume'].iloc[-1]) if 'volume' in df.columns else 0
+            quote_rows.append((
+                stock['symbol'], stock['name'], stock['market'], info['price'],
+                info['change'], info['rsi'], info['sma5'], info['sma20'], vol
+            ))
 
             change_str = f"+{info['change']:.2f}%" if info['change'] >= 0 else f"{info['change']:.2f}%"
             emit_log(
@@ -453,7 +777,7 @@ def monitor_loop():
                 commodity_data[stock['symbol']] = df
 
             # 检测信号
-            signals = detect_signals(stock['symbol'], df)
+            signals = detect_signals(stock['symbol'], df, ind)
             for sig in signals:
                 emit_signal(stock, sig)
                 direction_cn = "买入" if sig['direction'] == 'BUY' else "卖出"
@@ -462,14 +786,10 @@ def monitor_loop():
                     f"{sig['strategy']}: {sig['reason']}",
                     "signal"
                 )
-                try:
-                    db.save_signal(
-                        symbol=stock['symbol'], name=stock['name'],
-                        direction=sig['direction'], strategy=sig['strategy'],
-                        reason=sig['reason'], price=sig['price']
-                    )
-                except Exception:
-                    pass
+                signal_rows.append((
+                    stock['symbol'], stock['name'], sig['direction'],
+                    sig['strategy'], sig['reason'], sig['price']
+                ))
                 # 收集信号用于汇总邮件
                 all_signals_this_scan.append({
                     'name': stock['name'], 'symbol': stock['symbol'],
@@ -480,9 +800,15 @@ def monitor_loop():
         # 推送人民币计价的黄金/白银
         if usdcny and state.running:
             if 'GC=F' in commodity_data:
-                push_rmb_commodity('GC=F', '黄金(人民币/克)', usdcny, commodity_data['GC=F'])
+                push_rmb_commodity('GC=F', '黄金(人民币/克)', usdcny, commodity_data['GC=F'],
+                                   quote_rows, signal_rows)
             if 'SI=F' in commodity_data:
-                push_rmb_commodity('SI=F', '白银(人民币/克)', usdcny, commodity_data['SI=F'])
+                push_rmb_commodity('SI=F', '白银(人民币/克)', usdcny, commodity_data['SI=F'],
+                                   quote_rows, signal_rows)
+
+        # 本轮行情和信号交给后台线程批量入库，监控线程不等待磁盘
+        queue_db_write(db.save_quotes_bulk, quote_rows, scan_ts)
+        queue_db_write(db.save_signals_bulk, signal_rows, scan_ts)
 
         # 汇总发送一封邮件（本轮所有信号）
         if all_signals_this_scan:
@@ -491,10 +817,11 @@ def monitor_loop():
                 sell_list = [s for s in all_signals_this_scan if s['direction'] == '卖出']
                 now_str = datetime.now().strftime('%Y-%m-%d %H:%M')
                 subject = f"[量化监控] 第{state.scan_count}次扫描: {len(buy_list)}个买入 {len(sell_list)}个卖出"
-                rows = ""
+                # 每行先放进列表，最后一次 join，避免字符串反复 += 拼接
+                row_parts = []
                 for s in all_signals_this_scan:
                     color = '#2dd4bf' if s['direction'] == '买入' else '#f87171'
-                    rows += (
+                    row_parts.append(
                         f"<tr>"
                         f"<td style='padding:8px;border-bottom:1px solid #333;color:{color};font-weight:bold'>{s['direction']}</td>"
                         f"<td style='padding:8px;border-bottom:1px solid #333'>{s['name']}({s['symbol']})</td>"
@@ -503,6 +830,7 @@ def monitor_loop():
                         f"<td style='padding:8px;border-bottom:1px solid #333'>{s['reason']}</td>"
                         f"</tr>"
                     )
+                rows = ''.join(row_parts)
                 body = (
                     f"<div style='font-family:Arial,sans-serif;max-width:700px;margin:0 auto;background:#1a1a2e;color:#eee;padding:20px;border-radius:8px'>"
                     f"<h2 style='color:#58a6ff;margin-bottom:4px'>量化监控信号汇总</h2>"
@@ -526,11 +854,9 @@ def monitor_loop():
 
         if state.running:
             emit_log(f"下次扫描: {state.interval} 秒后...")
-            # 分段 sleep 以便及时响应停止
-            for _ in range(state.interval):
-                if not state.running:
-                    break
-                time.sleep(1)
+            # 阻塞等待到下一轮，期间不轮询；停止监控时 wait 立即返回 True
+            if state.stop_event.wait(state.interval):
+                break
 
     emit_log("监控已停止", "warning")
 
@@ -562,11 +888,11 @@ def api_start():
     data = request.get_json(silent=True) or {}
     state.interval = int(data.get('interval', state.interval))
     state.running = True
+    state.stop_event.clear()
     state.scan_count = 0
     state.last_signals.clear()
 
-    state.thread = threading.Thread(target=monitor_loop, daemon=True)
-    state.thread.start()
+    state.thread = socketio.start_background_task(monitor_loop)
 
     return jsonify({'ok': True, 'msg': '监控已启动'})
 
@@ -577,6 +903,7 @@ def api_stop():
         return jsonify({'ok': False, 'msg': '监控未在运行'})
 
     state.running = False
+    state.stop_event.set()
     return jsonify({'ok': True, 'msg': '正在停止...'})
 
 
@@ -608,11 +935,12 @@ def api_add_stock():
         name = symbol
 
     # 检查重复
-    for s in state.stocks:
-        if s['symbol'] == symbol:
-            return jsonify({'ok': False, 'msg': f'{symbol} 已在监控列表中'})
+    if symbol in state.stocks_by_symbol:
+        return jsonify({'ok': False, 'msg': f'{symbol} 已在监控列表中'})
 
     stock = {"symbol": symbol, "name": name, "market": market}
+    drop_cached_data(symbol)
+    state.stocks_by_symbol[symbol] = stock
     state.stocks.append(stock)
     emit_log(f"已添加监控: {name}({symbol})", "success")
     return jsonify({'ok': True, 'stock': stock})
@@ -620,9 +948,12 @@ def api_add_stock():
 
 @app.route('/api/stocks/<symbol>', methods=['DELETE'])
 def api_remove_stock(symbol):
-    before = len(state.stocks)
-    state.stocks = [s for s in state.stocks if s['symbol'] != symbol]
-    if len(state.stocks) < before:
+    stock = state.stocks_by_symbol.pop(symbol, None)
+    if stock is not None:
+        # 原地移除，监控线程持有的 list(state.stocks) 快照不受影响
+        state.stocks.remove(stock)
+        drop_cached_indicators(symbol)
+        drop_cached_data(symbol)
         emit_log(f"已移除监控: {symbol}", "warning")
         return jsonify({'ok': True})
     return jsonify({'ok': False, 'msg': '未找到该股票'})
@@ -667,9 +998,11 @@ def api_db_clear():
     tables = data.get('tables', None)   # None = 全部清空
     try:
         db.clear_data(tables)
+        if data.get('vacuum'):              # 显式要求时才回收磁盘空间
+            db.vacuum()
         stats = db.get_stats()
         socketio.emit('log', {
-            'time': datetime.now().strftime('%H:%M:%S'),
+            'time': _now_str(),
             'msg': f"🗑️ 数据已清空: {', '.join(tables) if tables else '全部'}",
             'level': 'warning'
         })
@@ -682,16 +1015,12 @@ def api_db_clear():
 def api_predict(symbol):
     """对指定标的进行趋势预测"""
     # 从监控列表中找到该标的
-    stock = None
-    for s in state.stocks:
-        if s['symbol'] == symbol:
-            stock = s
-            break
+    stock = state.stocks_by_symbol.get(symbol)
 
     if not stock:
         return jsonify({'error': f'{symbol} 不在监控列表中'})
 
-    df = fetch_data(symbol, stock['market'], days=120)
+    df = get_data(symbol, stock['market'], days=120)
     if df is None:
         return jsonify({'error': f'{symbol} 数据获取失败'})
 
@@ -704,10 +1033,12 @@ def api_predict(symbol):
 @app.route('/api/predict/all')
 def api_predict_all():
     """对所有监控标的进行预测"""
+    stocks = list(state.stocks)
+    # 未命中缓存的标的并发获取，预测本身（CPU 计算）按顺序进行
+    frames = _FETCH_POOL.map(lambda s: get_data(s['symbol'], s['market'], days=120), stocks)
     results = []
-    for stock in state.stocks:
+    for stock, df in zip(stocks, frames):
         try:
-            df = fetch_data(stock['symbol'], stock['market'], days=120)
             if df is None:
                 results.append({'symbol': stock['symbol'], 'name': stock['name'], 'error': '数据获取失败'})
                 continue
@@ -719,63 +1050,59 @@ def api_predict_all():
     return jsonify(results)
 
 
+def _round_list(arr, ndigits):
+    """ndarray -> 保留 ndigits 位小数的 list，NaN 转为 None（JSON 中为 null）"""
+    return [None if v != v else round(v, ndigits) for v in arr.tolist()]
+
+
 @app.route('/api/chart/<symbol>')
 def api_chart(symbol):
     """获取K线图表数据(OHLC+指标+信号)"""
-    stock = None
-    for s in state.stocks:
-        if s['symbol'] == symbol:
-            stock = s
-            break
+    stock = state.stocks_by_symbol.get(symbol)
     if not stock:
         return jsonify({'error': f'{symbol} 不在监控列表中'})
 
     days = int(request.args.get('days', 60))
-    df = fetch_data(symbol, stock['market'], days=days)
+    df = get_data(symbol, stock['market'], days=days)
     if df is None:
         return jsonify({'error': '数据获取失败'})
 
-    close = df['close']
-    # K线数据
-    candles = []
-    for idx, row in df.iterrows():
-        candles.append({
-            'date': idx.strftime('%Y-%m-%d'),
-            'open': round(float(row['open']), 4),
-            'high': round(float(row['high']), 4),
-            'low': round(float(row['low']), 4),
-            'close': round(float(row['close']), 4),
-            'volume': float(row.get('volume', 0)),
-        })
+    # K线数据：按列取出 Python float 列表后逐行拼装，不为每一行构造 Series
+    n = len(df)
+    dates = df.index.strftime('%Y-%m-%d').tolist()
+    opens, highs, lows, closes = (
+        [round(v, 4) for v in df[col].to_numpy(dtype=float).tolist()]
+        for col in ('open', 'high', 'low', 'close')
+    )
+    volumes = df['volume'].to_numpy(dtype=float).tolist() if 'volume' in df.columns else [0.0] * n
+    candles = [
+        {'date': d, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+        for d, o, h, l, c, v in zip(dates, opens, highs, lows, closes, volumes)
+    ]
 
-    # 指标
-    sma5_s = sma(close, 5)
-    sma20_s = sma(close, 20)
-    rsi_s = rsi(close, 14)
-    upper, middle, lower = bollinger_bands(close, 20, 2.0)
+    # 指标（一次计算，布林带中轨即 sma20；同一根K线内重复请求直接取缓存）
+    ind = indicators_for(symbol, df)
 
+    sma20_list = _round_list(ind['sma20'], 4)
     indicators = {
-        'sma5': [round(float(v), 4) if not pd.isna(v) else None for v in sma5_s],
-        'sma20': [round(float(v), 4) if not pd.isna(v) else None for v in sma20_s],
-        'rsi': [round(float(v), 2) if not pd.isna(v) else None for v in rsi_s],
-        'boll_upper': [round(float(v), 4) if not pd.isna(v) else None for v in upper],
-        'boll_middle': [round(float(v), 4) if not pd.isna(v) else None for v in middle],
-        'boll_lower': [round(float(v), 4) if not pd.isna(v) else None for v in lower],
+        'sma5': _round_list(ind['sma5'], 4),
+        'sma20': sma20_list,
+        'rsi': _round_list(ind['rsi14'], 2),
+        'boll_upper': _round_list(ind['boll_upper'], 4),
+        'boll_middle': sma20_list,
+        'boll_lower': _round_list(ind['boll_lower'], 4),
     }
 
-    # 买卖信号标记
-    buy_signals = []
-    sell_signals = []
-    sma5_arr = sma5_s.values
-    sma20_arr = sma20_s.values
-    for i in range(1, len(df)):
-        if i < 20:
-            continue
-        # SMA交叉信号
-        if sma5_arr[i-1] <= sma20_arr[i-1] and sma5_arr[i] > sma20_arr[i]:
-            buy_signals.append({'index': i, 'date': candles[i]['date'], 'price': candles[i]['close'], 'reason': 'SMA金叉'})
-        elif sma5_arr[i-1] >= sma20_arr[i-1] and sma5_arr[i] < sma20_arr[i]:
-            sell_signals.append({'index': i, 'date': candles[i]['date'], 'price': candles[i]['close'], 'reason': 'SMA死叉'})
+    # 买卖信号标记（SMA交叉）
+    buy_idx, sell_idx = _sma_cross_indices(ind['sma5'], ind['sma20'], 20)
+    buy_signals = [
+        {'index': i, 'date': candles[i]['date'], 'price': candles[i]['close'], 'reason': 'SMA金叉'}
+        for i in buy_idx
+    ]
+    sell_signals = [
+        {'index': i, 'date': candles[i]['date'], 'price': candles[i]['close'], 'reason': 'SMA死叉'}
+        for i in sell_idx
+    ]
 
     return jsonify({
         'symbol': symbol,
@@ -790,30 +1117,29 @@ def api_chart(symbol):
 @app.route('/api/backtest/<symbol>')
 def api_backtest(symbol):
     """对指定标的运行回测对比"""
-    stock = None
-    for s in state.stocks:
-        if s['symbol'] == symbol:
-            stock = s
-            break
+    stock = state.stocks_by_symbol.get(symbol)
     if not stock:
         return jsonify({'error': f'{symbol} 不在监控列表中'})
 
     days = int(request.args.get('days', 120))
     capital = float(request.args.get('capital', 100000))
-    df = fetch_data(symbol, stock['market'], days=days)
+    df = get_data(symbol, stock['market'], days=days)
     if df is None:
         return jsonify({'error': '数据获取失败'})
 
     results = []
-    close = df['close'].values.astype(float)
+    # 已是 float64 时直接取底层数组，不复制
+    close = df['close'].to_numpy(dtype=np.float64)
     dates = [d.strftime('%Y-%m-%d') for d in df.index]
+    # 三个策略共用一份指标
+    ind = indicators_for(symbol, df)
 
     # 策略1: SMA交叉
-    results.append(_run_simple_backtest(close, dates, capital, 'SMA交叉(5/20)', _sma_signals(df)))
+    results.append(_run_simple_backtest(close, dates, capital, 'SMA交叉(5/20)', _sma_signals(df, ind)))
     # 策略2: RSI
-    results.append(_run_simple_backtest(close, dates, capital, 'RSI(14)', _rsi_signals(df)))
+    results.append(_run_simple_backtest(close, dates, capital, 'RSI(14)', _rsi_signals(df, ind)))
     # 策略3: 布林带
-    results.append(_run_simple_backtest(close, dates, capital, '布林带(20,2)', _boll_signals(df)))
+    results.append(_run_simple_backtest(close, dates, capital, '布林带(20,2)', _boll_signals(df, ind)))
     # 基准: 买入持有
     buy_hold_return = (close[-1] / close[0] - 1) * 100
     results.append({
@@ -835,114 +1161,189 @@ def api_backtest(symbol):
     })
 
 
-def _sma_signals(df):
-    """SMA交叉信号列表: [(index, 'BUY'/'SELL'), ...]"""
-    close = df['close']
-    s5 = sma(close, 5).values
-    s20 = sma(close, 20).values
-    signals = []
-    for i in range(21, len(df)):
-        if s5[i-1] <= s20[i-1] and s5[i] > s20[i]:
-            signals.append((i, 'BUY'))
-        elif s5[i-1] >= s20[i-1] and s5[i] < s20[i]:
-            signals.append((i, 'SELL'))
+def _sma_cross_indices(fast, slow, start):
+    """
+    均线交叉位置（整段数组比较，不逐根循环），返回 (金叉下标列表, 死叉下标列表)，
+    只保留下标 >= start 的交叉。NaN 参与的比较均为 False，与逐根判断结果相同。
+    """
+    prev_le = fast[:-1] <= slow[:-1]
+    prev_ge = fast[:-1] >= slow[:-1]
+    now_gt = fast[1:] > slow[1:]
+    now_lt = fast[1:] < slow[1:]
+    offset = max(start, 1)
+    buys = np.flatnonzero((prev_le & now_gt)[offset - 1:]) + offset
+    sells = np.flatnonzero((prev_ge & now_lt)[offset - 1:]) + offset
+    return buys.tolist(), sells.tolist()
+
+
+def _sma_signals(df, ind=None):
+    """SMA交叉信号列表: [(index, 'BUY'/'SELL'), ...]（ind: compute_indicators 的结果）"""
+    if ind is None:
+        ind = compute_indicators(df)
+    buys, sells = _sma_cross_indices(ind['sma5'], ind['sma20'], 21)
+    # 金叉和死叉不会出现在同一根K线上，合并后按下标排序即为逐根扫描的顺序
+    signals = [(i, 'BUY') for i in buys] + [(i, 'SELL') for i in sells]
+    signals.sort()
     return signals
 
 
-def _rsi_signals(df):
-    close = df['close']
-    r = rsi(close, 14).values
-    signals = []
+@njit(cache=True)
+def _rsi_signals_nb(r, start, low, high):
+    """RSI 持仓状态机: 空仓且 RSI < low 买入，持仓且 RSI > high 卖出。返回 (下标, 方向 1/-1)"""
+    n = r.shape[0]
+    out_i = np.empty(n, np.int64)
+    out_d = np.empty(n, np.int8)
+    k = 0
     holding = False
-    for i in range(15, len(df)):
-        if not holding and r[i] < 30:
-            signals.append((i, 'BUY'))
+    for i in range(start, n):
+        if not holding and r[i] < low:
+            out_i[k] = i
+            out_d[k] = 1
+            k += 1
             holding = True
-        elif holding and r[i] > 70:
-            signals.append((i, 'SELL'))
+        elif holding and r[i] > high:
+            out_i[k] = i
+            out_d[k] = -1
+            k += 1
             holding = False
-    return signals
+    return out_i[:k], out_d[:k]
 
 
-def _boll_signals(df):
-    close = df['close']
-    upper, middle, lower = bollinger_bands(close, 20, 2.0)
-    u = upper.values
-    l = lower.values
-    c = close.values
-    signals = []
+@njit(cache=True)
+def _boll_signals_nb(close, upper, lower, start):
+    """布林带持仓状态机: 空仓且触及下轨买入，持仓且触及上轨卖出。返回 (下标, 方向 1/-1)"""
+    n = close.shape[0]
+    out_i = np.empty(n, np.int64)
+    out_d = np.empty(n, np.int8)
+    k = 0
     holding = False
-    for i in range(21, len(df)):
-        if not holding and c[i] <= l[i]:
-            signals.append((i, 'BUY'))
+    for i in range(start, n):
+        if not holding and close[i] <= lower[i]:
+            out_i[k] = i
+            out_d[k] = 1
+            k += 1
             holding = True
-        elif holding and c[i] >= u[i]:
-            signals.append((i, 'SELL'))
+        elif holding and close[i] >= upper[i]:
+            out_i[k] = i
+            out_d[k] = -1
+            k += 1
             holding = False
-    return signals
+    return out_i[:k], out_d[:k]
 
 
-def _run_simple_backtest(close, dates, capital, name, signals):
-    """简化回测引擎"""
+def _to_signal_list(idx, direction):
+    """(下标数组, 方向数组) -> [(index, 'BUY'/'SELL'), ...]"""
+    return [(i, 'BUY' if d == 1 else 'SELL') for i, d in zip(idx.tolist(), direction.tolist())]
+
+
+def _rsi_signals(df, ind=None):
+    if ind is None:
+        ind = compute_indicators(df)
+    return _to_signal_list(*_rsi_signals_nb(ind['rsi14'], 15, 30.0, 70.0))
+
+
+def _boll_signals(df, ind=None):
+    if ind is None:
+        ind = compute_indicators(df)
+    close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+    return _to_signal_list(*_boll_signals_nb(close, ind['boll_upper'], ind['boll_lower'], 21))
+
+
+@njit(cache=True)
+def _simple_backtest_nb(close, sig_idx, sig_dir, capital):
+    """
+    简化回测的逐K线循环（编译版本）。
+    sig_idx: 按下标升序排列的信号位置；sig_dir: 1 买入 / -1 卖出。
+    第 i 根K线用一个指针依次处理所有位置等于 i 的信号，不再每根K线扫描整个信号列表。
+    返回 (资金曲线, 各笔交易买入价, 各笔交易卖出价, 最大回撤)
+    """
+    n = close.shape[0]
+    m = sig_idx.shape[0]
+    equity = np.empty(max(n, 1))
+    trade_buy = np.empty(m)
+    trade_sell = np.empty(m)
+    n_trades = 0
     cash = capital
-    shares = 0
-    equity = [capital]
-    trades = []
-    buy_price = 0
-
-    for i in range(1, len(close)):
-        # 检查信号
-        for si, sd in signals:
-            if si == i:
-                if sd == 'BUY' and shares == 0:
-                    shares = int(cash / close[i])
-                    buy_price = close[i]
-                    cash -= shares * close[i]
-                elif sd == 'SELL' and shares > 0:
-                    cash += shares * close[i]
-                    pnl = (close[i] - buy_price) / buy_price * 100
-                    trades.append({'buy': buy_price, 'sell': close[i], 'pnl': round(pnl, 2)})
-                    shares = 0
-        equity.append(cash + shares * close[i])
-
-    total_return = (equity[-1] / capital - 1) * 100
-    wins = [t for t in trades if t['pnl'] > 0]
-    win_rate = len(wins) / len(trades) * 100 if trades else 0
+    shares = 0.0
+    buy_price = 0.0
+    equity[0] = capital
+    sp = 0
+    for i in range(1, n):
+        # 第 0 根K线上的信号不处理
+        while sp < m and sig_idx[sp] < i:
+            sp += 1
+        while sp < m and sig_idx[sp] == i:
+            price = close[i]
+            if sig_dir[sp] == 1 and shares == 0:
+                shares = float(int(cash / price))
+                buy_price = price
+                cash -= shares * price
+            elif sig_dir[sp] == -1 and shares > 0:
+                cash += shares * price
+                trade_buy[n_trades] = buy_price
+                trade_sell[n_trades] = price
+                n_trades += 1
+                shares = 0.0
+            sp += 1
+        equity[i] = cash + shares * close[i]
 
     # 最大回撤
-    eq_arr = equity
-    peak = eq_arr[0]
-    max_dd = 0
-    for v in eq_arr:
+    peak = equity[0]
+    max_dd = 0.0
+    for v in equity:
         if v > peak:
             peak = v
         dd = (peak - v) / peak
         if dd > max_dd:
             max_dd = dd
+    return equity, trade_buy[:n_trades], trade_sell[:n_trades], max_dd
+
+
+def _run_simple_backtest(close, dates, capital, name, signals):
+    """简化回测引擎（signals: [(index, 'BUY'/'SELL'), ...]）"""
+    # 信号转成数组并按下标稳定排序（同一根K线上的多个信号保持原有先后顺序）
+    sig_idx = np.array([si for si, _ in signals], dtype=np.int64)
+    sig_dir = np.array(
+        [1 if sd == 'BUY' else -1 if sd == 'SELL' else 0 for _, sd in signals], dtype=np.int8
+    )
+    order = np.argsort(sig_idx, kind='stable')
+    equity_arr, trade_buy, trade_sell, max_dd = _simple_backtest_nb(
+        np.ascontiguousarray(close, dtype=np.float64), sig_idx[order], sig_dir[order], float(capital)
+    )
+
+    # 收益率、资金曲线按 numpy 的方式取两位小数（与原先对 np.float64 调用 round 的结果一致）
+    pnls = np.round((trade_sell - trade_buy) / trade_buy * 100, 2)
+    trades = [
+        {'buy': b, 'sell': s, 'pnl': p}
+        for b, s, p in zip(trade_buy.tolist(), trade_sell.tolist(), pnls.tolist())
+    ]
+    final_equity = equity_arr[-1]
+    total_return = (final_equity / capital - 1) * 100
+    wins = [t for t in trades if t['pnl'] > 0]
+    win_rate = len(wins) / len(trades) * 100 if trades else 0
 
     return {
         'strategy': name,
         'total_return': round(total_return, 2),
-        'final_equity': round(equity[-1], 2),
+        'final_equity': round(final_equity, 2),
         'trades': len(trades),
         'win_rate': round(win_rate, 1),
         'max_drawdown': round(max_dd * 100, 2),
-        'equity_curve': [round(v, 2) for v in equity],
+        # 第一个点是初始资金本身
+        'equity_curve': [round(capital, 2)] + np.round(equity_arr[1:], 2).tolist(),
         'dates': dates,
         'trade_details': trades,
     }
 
 
 def _calc_max_dd(close):
-    peak = close[0]
-    max_dd = 0
-    for c in close:
-        if c > peak:
-            peak = c
-        dd = (peak - c) / peak
-        if dd > max_dd:
-            max_dd = dd
-    return max_dd
+    """买入持有的最大回撤比例：历史最高价用累计最大值一次算出，不逐根循环"""
+    c = np.asarray(close, dtype=np.float64)
+    # fmax 忽略 NaN，与逐根比较时 NaN 不更新最高价、不计入回撤的结果一致
+    peaks = np.fmax.accumulate(c)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dd = (peaks - c) / peaks
+    return float(np.fmax.reduce(dd, initial=0.0))
 
 
 # ============================================================